@@ -0,0 +1,114 @@
+"""Generate a realistic and reproducible corpus of specifiers.
+
+Nothing is downloaded: the corpus is built from a seeded random generator,
+so the same seed always gives the same specifiers.
+"""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable
+
+
+def _release(rnd: random.Random, parts: int) -> str:
+    return '.'.join(str(rnd.randint(0, 12)) for _ in range(parts))
+
+
+def _version(rnd: random.Random, parts: int | None = None) -> str:
+    if parts is None:
+        parts = rnd.choice((1, 2, 2, 3, 3, 3))
+    version = _release(rnd, parts)
+    suffix = rnd.random()
+    if suffix < .05:
+        version += rnd.choice(('a', 'b', 'rc')) + str(rnd.randint(1, 3))
+    elif suffix < .08:
+        version += '.post' + str(rnd.randint(1, 3))
+    elif suffix < .1:
+        version += '.dev' + str(rnd.randint(0, 3))
+    return version
+
+
+def _pep440(rnd: random.Random) -> str:
+    count = rnd.choice((1, 1, 2, 2, 3))
+    operators = ('>=', '>', '<', '<=', '==', '!=', '~=')
+    constraints = []
+    for _ in range(count):
+        operator = rnd.choice(operators)
+        if operator == '~=':
+            constraints.append(operator + _version(rnd, parts=rnd.choice((2, 3))))
+        else:
+            constraints.append(operator + _version(rnd))
+    return ','.join(constraints)
+
+
+def _npm(rnd: random.Random) -> str:
+    kind = rnd.random()
+    if kind < .4:
+        return '^' + _version(rnd, parts=3)
+    if kind < .7:
+        return '~' + _version(rnd, parts=3)
+    if kind < .85:
+        return '{} - {}'.format(_version(rnd, parts=3), _version(rnd, parts=3))
+    return '>={} <{}'.format(_version(rnd, parts=2), _version(rnd, parts=1))
+
+
+def _maven(rnd: random.Random) -> str:
+    left = _version(rnd, parts=2)
+    right = _version(rnd, parts=2)
+    kind = rnd.random()
+    if kind < .3:
+        return '[{},{})'.format(left, right)
+    if kind < .5:
+        return '({},{}]'.format(left, right)
+    if kind < .7:
+        return '[{}]'.format(left)
+    return '(,{}],[{},)'.format(left, right)
+
+
+def _star(rnd: random.Random) -> str:
+    operator = rnd.choice(('==', '!=', '>=', '<', '', '<=', '>'))
+    prefix = _release(rnd, parts=rnd.choice((1, 2)))
+    star = rnd.choice(('.*', '.x', '.X'))
+    return operator + prefix + star
+
+
+def _or_chain(rnd: random.Random) -> str:
+    count = rnd.randint(2, 4)
+    makers = (_pep440, _npm, _star)
+    return ' || '.join(rnd.choice(makers)(rnd) for _ in range(count))
+
+
+KINDS: dict[str, Callable[[random.Random], str]] = {
+    'pep440': _pep440,
+    'npm': _npm,
+    'maven': _maven,
+    'star': _star,
+    'or': _or_chain,
+}
+WEIGHTS = (50, 20, 10, 10, 10)
+
+
+def generate_specs(count: int, seed: int = 42) -> list[str]:
+    """Generate specifiers of all kinds in realistic proportions.
+    """
+    rnd = random.Random(seed)
+    makers = rnd.choices(list(KINDS.values()), weights=WEIGHTS, k=count)
+    return [maker(rnd) for maker in makers]
+
+
+def generate_versions(count: int, seed: int = 42) -> list[str]:
+    rnd = random.Random(seed)
+    return [_version(rnd) for _ in range(count)]
+
+
+def generate_releases(count: int, seed: int = 42) -> list[SimpleNamespace]:
+    """Generate releases with `version` and `time` attributes.
+    """
+    rnd = random.Random(seed)
+    start = datetime(2010, 1, 1)
+    releases = []
+    for index, version in enumerate(generate_versions(count, seed=seed)):
+        time = start + timedelta(days=index, hours=rnd.randint(0, 23))
+        releases.append(SimpleNamespace(version=version, time=time))
+    return releases
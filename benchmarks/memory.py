@@ -0,0 +1,61 @@
+"""Measure memory footprint of parsed specifiers.
+
+Run it as `python3 -m benchmarks.memory` from the repository root.
+"""
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from typing import Callable
+
+from dephell_specifier import RangeSpecifier, Specifier
+from dephell_specifier.cache import VERSION_CACHE
+
+
+COUNT = 10000
+
+
+def footprint(factory: Callable[[int], object], count: int = COUNT) -> float:
+    """Average allocated bytes per object created by the factory.
+
+    The version cache is disabled to not count cached versions.
+    """
+    maxsize = VERSION_CACHE.maxsize
+    VERSION_CACHE.resize(0)
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(index) for index in range(count)]
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    VERSION_CACHE.resize(maxsize)
+    del objects
+    return size / count
+
+
+CASES: dict[str, Callable[[int], object]] = {
+    'Specifier': lambda index: Specifier('>=1.{}'.format(index)),
+    'Specifier (compared)': lambda index: _compared(Specifier('>=1.{}'.format(index))),
+    'RangeSpecifier (and)': lambda index: RangeSpecifier('>=1.{},<2'.format(index)),
+    'RangeSpecifier (or)': lambda index: RangeSpecifier('<1.{} || >=2,<3'.format(index)),
+    'RangeSpecifier (compiled)': lambda index: _compiled(RangeSpecifier('>=1.{},<2'.format(index))),
+}
+
+
+def _compared(spec: Specifier) -> Specifier:
+    spec.version
+    hash(spec)
+    return spec
+
+
+def _compiled(spec: RangeSpecifier) -> RangeSpecifier:
+    spec.compile()
+    return spec
+
+
+def main() -> None:
+    for name, factory in CASES.items():
+        print('{:<28} {:>8.0f} bytes'.format(name, footprint(factory)))
+
+
+if __name__ == '__main__':
+    main()
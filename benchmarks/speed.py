@@ -0,0 +1,244 @@
+"""Measure speed of the most common operations on a generated corpus.
+
+Run it as `python3 -m benchmarks.speed` from the repository root.
+Use `--output results.json` to save results and compare them between releases.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from functools import lru_cache
+from typing import Any, Callable, Sequence
+
+import packaging
+
+from dephell_specifier import RangeSpecifier
+from dephell_specifier.cache import VERSION_CACHE
+from dephell_specifier.releases import attach_times
+from dephell_specifier.vectorized import acceptance_matrix
+
+from .corpus import generate_releases, generate_specs, generate_versions
+
+
+SCALES = (100, 1000, 10000)
+# how many versions are checked by every specifier in `contains`
+VERSIONS = 20
+# how many releases are passed into `attach_time`
+RELEASES = 50
+# how many specifiers are merged by one `merge_all`
+MERGE_GROUP = 10
+
+
+@lru_cache(maxsize=None)
+def _corpus(count: int, seed: int) -> tuple[str, ...]:
+    """Generate the corpus and check that all cases support every specifier.
+
+    A specifier that fails raises here, so no syntax is silently left out.
+    """
+    specs = tuple(generate_specs(count, seed=seed))
+    for spec in specs:
+        parsed = RangeSpecifier(spec)
+        parsed.peppify()
+        parsed.to_marker('python_version')
+    return specs
+
+
+def _parse(specs: Sequence[str], **kwargs) -> Callable[[], Any]:
+    def run() -> None:
+        for spec in specs:
+            RangeSpecifier(spec)
+    return run
+
+
+def _parse_lazy(specs: Sequence[str], **kwargs) -> Callable[[], Any]:
+    def run() -> None:
+        for spec in specs:
+            RangeSpecifier(spec, lazy=True)
+    return run
+
+
+def _contains(specs: Sequence[str], versions: Sequence[str], **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        for spec in parsed:
+            for version in versions:
+                _ = version in spec
+    return run
+
+
+def _matrix(specs: Sequence[str], versions: Sequence[str], **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        acceptance_matrix(parsed, versions)
+    return run
+
+
+def _attach(specs: Sequence[str], **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+    pairs = list(zip(parsed, parsed[1:] + parsed[:1]))
+
+    def run() -> None:
+        # `+` is deferred, so the merge is forced by `+=`
+        for left, right in pairs:
+            new = left.copy()
+            new += right
+    return run
+
+
+def _merge_all(specs: Sequence[str], **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+    # constraints of dependents on the same package
+    groups = [parsed[start:start + MERGE_GROUP] for start in range(0, len(parsed), MERGE_GROUP)]
+
+    def run() -> None:
+        for group in groups:
+            RangeSpecifier.merge_all(group)
+    return run
+
+
+def _peppify(specs: Sequence[str], **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        for spec in parsed:
+            spec.peppify()
+    return run
+
+
+def _to_marker(specs: Sequence[str], **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        for spec in parsed:
+            spec.to_marker('python_version')
+    return run
+
+
+def _hash(specs: Sequence[str], **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        for spec in parsed:
+            hash(spec)
+    return run
+
+
+def _attach_time(specs: Sequence[str], releases: Sequence, **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        # `attach_time` changes the specifier, so every run gets fresh copies
+        for spec in parsed:
+            spec.copy().attach_time(releases)
+    return run
+
+
+def _attach_time_index(specs: Sequence[str], releases: Sequence, **kwargs) -> Callable[[], Any]:
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        # the index is built once for all specifiers
+        attach_times([spec.copy() for spec in parsed], releases)
+    return run
+
+
+CASES: dict[str, Callable[..., Callable[[], Any]]] = {
+    'parse': _parse,
+    'parse_lazy': _parse_lazy,
+    'contains': _contains,
+    'matrix': _matrix,
+    'attach': _attach,
+    'merge_all': _merge_all,
+    'peppify': _peppify,
+    'to_marker': _to_marker,
+    'hash': _hash,
+    'attach_time': _attach_time,
+    'attach_time_index': _attach_time_index,
+}
+
+
+def measure(case: str, scale: int, repeat: int = 3, seed: int = 42) -> dict[str, Any]:
+    """Run the case on `scale` specifiers `repeat` times and return the best time.
+    """
+    specs = _corpus(scale, seed=seed)
+    versions = generate_versions(VERSIONS, seed=seed)
+    releases = generate_releases(RELEASES, seed=seed)
+
+    timings = []
+    for _ in range(repeat):
+        VERSION_CACHE.clear()
+        run = CASES[case](specs=specs, versions=versions, releases=releases)
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return dict(
+        case=case,
+        scale=len(specs),
+        repeat=repeat,
+        best=best,
+        mean=sum(timings) / len(timings),
+        per_item_us=best / len(specs) * 1e6,
+    )
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='path to save JSON results, `-` for stdout')
+    parser.add_argument('--compare', help='path to JSON results to compare with')
+    return parser
+
+
+def compare(results: list[dict[str, Any]], path: str) -> None:
+    """Print how many times every case is faster than in the saved results.
+    """
+    with open(path) as stream:
+        baseline = json.load(stream)
+    old = {(result['case'], result['scale']): result['best'] for result in baseline['results']}
+    for result in results:
+        before = old.get((result['case'], result['scale']))
+        if before is None:
+            continue
+        print('{case:<18} {scale:>7} {ratio:>8.2f}x'.format(ratio=before / result['best'], **result))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+    results = []
+    for case in args.cases:
+        for scale in args.scales:
+            result = measure(case, scale, repeat=args.repeat, seed=args.seed)
+            results.append(result)
+            if args.output != '-':
+                print('{case:<18} {scale:>7} {best:>9.4f}s {per_item_us:>9.2f}µs/item'.format(**result))
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        report = dict(
+            python=platform.python_version(),
+            implementation=platform.python_implementation(),
+            packaging=packaging.__version__,
+            seed=args.seed,
+            results=results,
+        )
+        if args.output == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, 'w') as stream:
+                json.dump(report, stream, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
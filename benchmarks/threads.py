@@ -0,0 +1,97 @@
+"""Measure how throughput scales with the number of threads.
+
+Run it as `python3 -m benchmarks.threads` from the repository root.
+On builds with the GIL the throughput doesn't grow with threads,
+use a free-threaded build (`python3.13t`) to see the scaling.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Sequence
+
+from dephell_specifier import RangeSpecifier
+from dephell_specifier.cache import RANGE_CACHE, SPECIFIER_CACHE
+
+from .corpus import generate_versions
+from .speed import _corpus
+
+
+# how many versions are checked by every specifier in `contains`
+VERSIONS = 20
+
+
+def _parse(specs: Sequence[str], versions: Sequence[str]) -> Callable[[], None]:
+    def run() -> None:
+        for spec in specs:
+            RangeSpecifier(spec)
+    return run
+
+
+def _contains(specs: Sequence[str], versions: Sequence[str]) -> Callable[[], None]:
+    # shared between all threads
+    parsed = [RangeSpecifier(spec) for spec in specs]
+
+    def run() -> None:
+        for spec in parsed:
+            for version in versions:
+                _ = version in spec
+    return run
+
+
+CASES: dict[str, Callable[[Sequence[str], Sequence[str]], Callable[[], None]]] = {
+    'parse': _parse,
+    'contains': _contains,
+}
+
+
+def measure(case: str, threads: int, scale: int, seed: int = 42) -> float:
+    """Run the case in every thread at once and return operations per second.
+    """
+    specs = _corpus(scale, seed=seed)
+    versions = generate_versions(VERSIONS, seed=seed)
+    run = CASES[case](specs, versions)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        futures = [executor.submit(run) for _ in range(threads)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    return threads * len(specs) / elapsed
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--scale', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--caches', type=int, default=1000, help='size of parsing caches, 0 to disable')
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('python {} ({}), {} CPUs'.format(
+        sys.version.split()[0], 'GIL' if gil else 'free-threaded', os.cpu_count(),
+    ))
+    RANGE_CACHE.resize(args.caches)
+    SPECIFIER_CACHE.resize(args.caches)
+    for case in args.cases:
+        base = None
+        for threads in sorted(set(args.threads)):
+            speed = measure(case, threads, scale=args.scale, seed=args.seed)
+            if base is None:
+                base = speed
+            print('{case:<10} {threads:>3} threads {speed:>12.0f} ops/s {ratio:>6.2f}x'.format(
+                case=case, threads=threads, speed=speed, ratio=speed / base,
+            ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
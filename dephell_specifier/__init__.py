@@ -5,9 +5,10 @@ Supports PEP-440, SemVer, Ruby, NPM, and Maven specifier formats.
 from __future__ import annotations
 
 from .git_specifier import GitSpecifier
+from .intervals import Intervals
 from .range_specifier import RangeSpecifier
 from .specifier import Specifier
 
 
 __version__ = '0.3.0'
-__all__ = ['GitSpecifier', 'RangeSpecifier', 'Specifier']
+__all__ = ['GitSpecifier', 'Intervals', 'RangeSpecifier', 'Specifier']
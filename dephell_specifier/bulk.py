@@ -0,0 +1,56 @@
+"""Parse many specifiers at once using a pool of processes.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Union
+
+from .range_specifier import RangeSpecifier
+
+
+ParseResult = Union[RangeSpecifier, Exception]
+
+
+def _parse_chunk(specs: list[str]) -> list[ParseResult]:
+    # equal constraints are interned, so pickle sends every distinct one only once,
+    # and they are interned again when unpickled
+    result: list[ParseResult] = []
+    for spec in specs:
+        try:
+            result.append(RangeSpecifier(spec))
+        except Exception as exc:
+            result.append(exc)
+    return result
+
+
+def parse_many(specs: Iterable[str], workers: int | None = None, chunksize: int = 2048) -> list[ParseResult]:
+    """Parse specifiers in order, returning exception instead of the result if it fails.
+
+    Every distinct string is parsed only once. If `workers` is more than 1
+    (or None for the number of CPUs), strings are sent to a pool of processes
+    in chunks of `chunksize` strings.
+    """
+    specs = list(specs)
+    unique = list(dict.fromkeys(specs))
+    chunks = [unique[start:start + chunksize] for start in range(0, len(unique), chunksize)]
+
+    if workers == 0 or workers == 1 or len(chunks) <= 1:
+        parsed = [_parse_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(_parse_chunk, chunks))
+
+    results: dict[str, ParseResult] = dict()
+    for chunk, chunk_result in zip(chunks, parsed):
+        results.update(zip(chunk, chunk_result))
+
+    # duplicates get copies because specifiers are mutable
+    seen = set()
+    output: list[ParseResult] = []
+    for spec in specs:
+        result = results[spec]
+        if spec in seen and isinstance(result, RangeSpecifier):
+            result = result.copy()
+        seen.add(spec)
+        output.append(result)
+    return output
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterable, NamedTuple
+from weakref import WeakValueDictionary
+
+from packaging.version import Version, parse
+
+
+# without the GIL, single operations on `OrderedDict` can run at the same time
+FREE_THREADED = not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """Size-bounded mapping that evicts the least recently used entries.
+
+    Cache with `maxsize=0` is disabled: it stores nothing and doesn't count
+    hits and misses. Values must be immutable because they are shared
+    between all consumers.
+
+    The cache can be shared between threads. Writes are done under the lock,
+    lookups don't wait for it. On free-threaded builds, if another thread holds
+    the lock, the found entry isn't moved to the end, so the eviction order
+    is approximate under contention. Statistics can lose some updates
+    in concurrent use.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = Lock()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> Any:
+        """Returns cached value or None.
+        """
+        if self.maxsize <= 0:
+            return None
+        data = self._data
+        value = data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if not FREE_THREADED:
+            self._touch(key)
+        elif self._lock.acquire(blocking=False):
+            try:
+                self._touch(key)
+            finally:
+                self._lock.release()
+        return value
+
+    def _touch(self, key: Hashable) -> None:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            # evicted by another thread
+            pass
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int) -> None:
+        """Change the max size, evicting extra entries if needed.
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            maxsize=self.maxsize,
+            currsize=len(self._data),
+        )
+
+    def _evict(self) -> None:
+        # must be called under the lock
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return '{name}(maxsize={maxsize}, currsize={currsize})'.format(
+            name=type(self).__name__,
+            maxsize=self.maxsize,
+            currsize=len(self._data),
+        )
+
+
+class InternInfo(NamedTuple):
+    hits: int
+    misses: int
+    currsize: int
+    # share of requested objects that reused an existing one
+    dedup_ratio: float
+
+
+class InternTable:
+    """Weak mapping that makes equal immutable objects share one instance.
+
+    An object lives in the table while something else refers to it.
+    Disabled table creates a new object on every request.
+
+    Objects are created out of the lock, and the first published object
+    wins, so all threads get the same instance.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self._data: WeakValueDictionary[Hashable, Any] = WeakValueDictionary()
+        self._lock = Lock()
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, factory: Callable[[Any], Any]) -> Any:
+        """Returns the shared object for the key, creating it by `factory(key)` if needed.
+        """
+        if not self.enabled:
+            return factory(key)
+        value = self._data.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        value = factory(key)
+        with self._lock:
+            published = self._data.get(key)
+            if published is not None:
+                self.hits += 1
+                return published
+            self._data[key] = value
+            self.misses += 1
+        return value
+
+    def clear(self) -> None:
+        """Forget all objects and reset statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> InternInfo:
+        total = self.hits + self.misses
+        return InternInfo(
+            hits=self.hits,
+            misses=self.misses,
+            currsize=len(self._data),
+            dedup_ratio=self.hits / total if total else 0.0,
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return '{name}(enabled={enabled}, currsize={currsize})'.format(
+            name=type(self).__name__,
+            enabled=self.enabled,
+            currsize=len(self._data),
+        )
+
+
+# parsed `RangeSpecifier` strings, disabled by default
+RANGE_CACHE = LRUCache()
+# `packaging` specifiers for `Specifier` constraints, disabled by default
+SPECIFIER_CACHE = LRUCache()
+# `Specifier` constraints shared by all parsed `RangeSpecifier`s
+INTERN_TABLE = InternTable()
+# parsed version strings, shared by all specifiers
+VERSION_CACHE = LRUCache(maxsize=4096)
+
+
+def parse_version(version: str) -> Version:
+    """Parse the version string, reusing the result from `VERSION_CACHE`.
+    """
+    parsed = VERSION_CACHE.get(version)
+    if parsed is None:
+        parsed = parse(version)
+        VERSION_CACHE.set(version, parsed)
+    return parsed
+
+
+def warm_version_cache(releases: Iterable) -> int:
+    """Put versions into `VERSION_CACHE` before they are checked.
+
+    Accepts version strings, `Version` objects, and releases
+    with `version` attribute. Returns how many versions were added.
+    """
+    count = 0
+    for release in releases:
+        version = getattr(release, 'version', release)
+        if isinstance(version, str):
+            parsed = parse(version)
+        else:
+            parsed, version = version, str(version)
+        if version not in VERSION_CACHE:
+            count += 1
+        VERSION_CACHE.set(version, parsed)
+    return count
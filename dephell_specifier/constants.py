@@ -9,9 +9,9 @@ class JoinTypes(Enum):
     OR = 2
 
 
-PYTHONS_DEPRECATED = ('2.6', '2.7', '3.0', '3.1', '3.2', '3.3', '3.4')
-PYTHONS_POPULAR = ('3.5', '3.6', '3.7')
-PYTHONS_UNRELEASED = ('3.8', '4.0')
+PYTHONS_DEPRECATED = ('2.6', '2.7', '3.0', '3.1', '3.2', '3.3', '3.4', '3.5', '3.6', '3.7', '3.8', '3.9')
+PYTHONS_POPULAR = ('3.10', '3.11', '3.12', '3.13', '3.14')
+PYTHONS_UNRELEASED = ('3.15', '4.0')
 PYTHONS = PYTHONS_POPULAR + PYTHONS_DEPRECATED + PYTHONS_UNRELEASED
 
 OPERATOR_SYMBOLS = '!><=[]()~^,'
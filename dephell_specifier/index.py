@@ -0,0 +1,177 @@
+"""Index of many specifiers to find which of them accept a version.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from math import isqrt
+from typing import Hashable, Iterable, Iterator, Mapping
+
+from packaging.version import Version
+
+from .cache import parse_version
+from .intervals import MIN, BoundKey, Intervals, version_key
+
+
+class SpecifierIndex:
+    """Specifiers by keys, indexed by the compiled intervals.
+
+    All boundaries of all specifiers split versions on elementary segments,
+    and a segment tree over them stores every interval in O(log n) nodes.
+    So, the keys of specifiers accepting (or rejecting) a version are
+    collected on the path from the version's segment to the root,
+    in O(log n + k).
+
+    Specifiers that cannot be compiled (git, `===`) are checked one by one.
+    Versions are compared by version, attached time is ignored.
+    """
+
+    def __init__(self, specs: Mapping | Iterable = ()) -> None:
+        self._specs: dict = dict()
+        self._compiled: dict[Hashable, Intervals] = dict()
+        # specifiers checked by `in`: cannot be compiled
+        self._fallback: dict = dict()
+        # compiled, but not in the tree yet: have boundaries unknown for the tree
+        self._pending: set = set()
+        self._next_key = 0
+        self._rebuild()
+
+        if isinstance(specs, Mapping):
+            for key, spec in specs.items():
+                self.add(spec, key=key)
+        else:
+            for spec in specs:
+                self.add(spec)
+
+    def add(self, spec: object, key: Hashable | None = None) -> Hashable:
+        """Add the specifier, replacing one with the same key. Returns the key.
+
+        If the key isn't specified, the next free integer is used.
+        """
+        if key is None:
+            while self._next_key in self._specs:
+                self._next_key += 1
+            key = self._next_key
+            self._next_key += 1
+        if key in self._specs:
+            self.remove(key)
+
+        self._specs[key] = spec
+        intervals = getattr(spec, '_intervals', None)
+        if intervals is None:
+            self._fallback[key] = spec
+            return key
+        self._compiled[key] = intervals
+
+        positions = self._positions
+        if all(bound in positions for bound in intervals.bounds):
+            self._insert(key, intervals)
+            return key
+        # new boundaries change segments, so the tree is rebuilt
+        # only when there are too many specifiers outside of it
+        self._pending.add(key)
+        if len(self._pending) > max(16, isqrt(len(self._compiled))):
+            self._rebuild()
+        return key
+
+    def remove(self, key: Hashable) -> None:
+        """Remove the specifier by key. Raises KeyError if there is no such key.
+        """
+        del self._specs[key]
+        if self._fallback.pop(key, None) is not None:
+            return
+        intervals = self._compiled.pop(key)
+        if key in self._pending:
+            self._pending.discard(key)
+            return
+        self._update(self._accepting, intervals, key, add=False)
+        self._update(self._rejecting, intervals.complement(), key, add=False)
+
+    def accepting(self, version: str | Version) -> set:
+        """Keys of specifiers that match the version.
+        """
+        return self._query(version, accept=True)
+
+    def rejecting(self, version: str | Version) -> set:
+        """Keys of specifiers that don't match the version.
+        """
+        return self._query(version, accept=False)
+
+    def _query(self, version: str | Version, accept: bool) -> set:
+        point = version_key(parse_version(version) if isinstance(version, str) else version)
+
+        result: set = set()
+        tree = self._accepting if accept else self._rejecting
+        node = bisect_right(self._coords, point) + self._size
+        while node:
+            keys = tree[node]
+            if keys:
+                result.update(keys)
+            node >>= 1
+
+        for key in self._pending:
+            if self._compiled[key].contains_key(point) is accept:
+                result.add(key)
+        for key, spec in self._fallback.items():
+            if (version in spec) is accept:
+                result.add(key)
+        return result
+
+    def _rebuild(self) -> None:
+        bounds = {MIN}
+        for intervals in self._compiled.values():
+            bounds.update(intervals.bounds)
+        self._coords: list[BoundKey] = sorted(bounds)
+        self._positions = {bound: index for index, bound in enumerate(self._coords)}
+        # segment `i` is versions between `coords[i - 1]` and `coords[i]`
+        self._size = len(self._coords) + 1
+        self._accepting: list[set | None] = [None] * (2 * self._size)
+        self._rejecting: list[set | None] = [None] * (2 * self._size)
+        self._pending = set()
+        for key, intervals in self._compiled.items():
+            self._insert(key, intervals)
+
+    def _insert(self, key: Hashable, intervals: Intervals) -> None:
+        self._update(self._accepting, intervals, key, add=True)
+        self._update(self._rejecting, intervals.complement(), key, add=True)
+
+    def _update(self, tree: list, intervals: Intervals, key: Hashable, add: bool) -> None:
+        positions = self._positions
+        size = self._size
+        for lower, upper in intervals:
+            # segments from the one starting at `lower` to the one ending at `upper`
+            left = positions[lower] + 1 + size
+            right = (size if upper is None else positions[upper] + 1) + size
+            while left < right:
+                if left & 1:
+                    self._update_node(tree, left, key, add)
+                    left += 1
+                if right & 1:
+                    right -= 1
+                    self._update_node(tree, right, key, add)
+                left >>= 1
+                right >>= 1
+
+    @staticmethod
+    def _update_node(tree: list, node: int, key: Hashable, add: bool) -> None:
+        keys = tree[node]
+        if add:
+            if keys is None:
+                keys = tree[node] = set()
+            keys.add(key)
+        elif keys is not None:
+            keys.discard(key)
+
+    def __getitem__(self, key: Hashable) -> object:
+        return self._specs[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._specs
+
+    def __iter__(self) -> Iterator:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __repr__(self) -> str:
+        return '{name}({count} specifiers)'.format(name=type(self).__name__, count=len(self._specs))
@@ -0,0 +1,560 @@
+"""Version sets as sorted lists of disjoint half-open intervals.
+
+Every version is mapped on a comparison key that orders exactly like
+`packaging.version.Version`. A set of versions is a sorted tuple of boundary
+keys: versions between an even boundary (inclusive) and the next odd one
+(exclusive) are in the set. So, membership is a single `bisect` call.
+
+Inclusive upper bounds and exclusive lower bounds are converted into
+half-open ones by using the nearest next version (`<=1.2` is `<1.2.post0.dev0`)
+or synthetic keys that do not belong to any real version (`>1.2` is above
+all post-releases of `1.2`, and there is no least version above them).
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, Sequence
+
+from packaging.version import Version
+
+from .cache import parse_version
+
+
+# key layout:
+# (epoch, release, pre_rank, pre, post_rank, post, dev_rank, dev, local)
+BoundKey = tuple
+
+# less than key of any version
+MIN: BoundKey = ()
+PRE_RANKS = {'a': 1, 'b': 2, 'rc': 3}
+PRE_NAMES = {rank: name for name, rank in PRE_RANKS.items()}
+
+
+def _trim(release: tuple[int, ...]) -> tuple[int, ...]:
+    end = len(release)
+    while end > 1 and release[end - 1] == 0:
+        end -= 1
+    return release[:end]
+
+
+def _make_key(epoch: int, release: tuple[int, ...], pre: tuple[str, int] | None = None,
+              post: int | None = None, dev: int | None = None, local: str | None = None) -> BoundKey:
+    if pre is not None:
+        pre_rank, pre_number = PRE_RANKS[pre[0]], pre[1]
+    elif post is None and dev is not None:
+        pre_rank, pre_number = 0, 0
+    else:
+        pre_rank, pre_number = 4, 0
+
+    local_key: tuple = ()
+    if local is not None:
+        local_key = tuple((1, int(part)) if part.isdigit() else (0, part) for part in local.split('.'))
+
+    return (
+        epoch,
+        _trim(release),
+        pre_rank,
+        pre_number,
+        0 if post is None else 1,
+        post or 0,
+        1 if dev is None else 0,
+        dev or 0,
+        local_key,
+    )
+
+
+def version_key(version: Version) -> BoundKey:
+    """Comparison key for the version, ordered the same way as `Version`.
+    """
+    release = version.release
+    pre = version.pre
+    post = version.post
+    dev = version.dev
+    local = version.local
+    # fast path for the most common case: final release without local segment
+    if pre is None and post is None and dev is None and local is None:
+        if len(release) > 1 and release[-1] == 0:
+            release = _trim(release)
+        return (version.epoch, release, 4, 0, 0, 0, 1, 0, ())
+    return _make_key(version.epoch, release, pre, post, dev, local)
+
+
+# the least possible version, `0.dev0`
+ZERO = _make_key(0, (0, ), dev=0)
+
+
+def _successor(version: Version) -> BoundKey:
+    """The least version greater than the version and all its local versions.
+    """
+    if version.dev is not None:
+        return _make_key(version.epoch, version.release, version.pre, version.post, version.dev + 1)
+    if version.post is not None:
+        return _make_key(version.epoch, version.release, version.pre, version.post + 1, 0)
+    return _make_key(version.epoch, version.release, version.pre, 0, 0)
+
+
+def _after_posts(version: Version) -> BoundKey:
+    """Synthetic key above the version and all its post-releases.
+    """
+    if version.pre is not None:
+        kind, number = version.pre
+        return _make_key(version.epoch, version.release, (kind, number + 1), dev=0)
+    key = version_key(version)
+    return key[:4] + (2, 0, 0, 0, ())
+
+
+def _prefix_bounds(epoch: int, prefix: tuple[int, ...]) -> tuple[BoundKey, BoundKey]:
+    """Bounds of all versions which release starts from the prefix.
+    """
+    upper = prefix[:-1] + (prefix[-1] + 1, )
+    return _make_key(epoch, prefix, dev=0), _make_key(epoch, upper, dev=0)
+
+
+def _normalize(bounds: Sequence[BoundKey]) -> tuple[BoundKey, ...]:
+    # nothing is below `0.dev0`, so both bounds are the same
+    if bounds and bounds[0] == ZERO:
+        bounds = (MIN, ) + tuple(bounds[1:])
+    if len(bounds) > 1 and bounds[0] == MIN and bounds[1] <= ZERO:
+        bounds = tuple(bounds[2:])
+    return tuple(bounds)
+
+
+def specifier_bounds(operator: str, raw_version: str) -> tuple[BoundKey, ...] | None:
+    """Convert a single PEP-440 constraint into boundary keys.
+
+    Returns None for arbitrary equality (`===`) that compares strings
+    rather than versions.
+    """
+    if operator == '===':
+        return None
+
+    if raw_version.endswith('.*'):
+        version = Version(raw_version[:-2])
+        lower, upper = _prefix_bounds(version.epoch, version.release)
+        if operator == '==':
+            return _normalize((lower, upper))
+        if operator == '!=':
+            return _normalize((MIN, lower, upper))
+        raise ValueError('unsupported operator for star version: {}'.format(operator))
+
+    version = Version(raw_version)
+    if operator == '>=':
+        return _normalize((version_key(version), ))
+    if operator == '<=':
+        return _normalize((MIN, _successor(version)))
+    if operator == '>':
+        if version.dev is not None or version.post is not None:
+            return _normalize((_successor(version), ))
+        return _normalize((_after_posts(version), ))
+    if operator == '<':
+        if version.is_prerelease:
+            return _normalize((MIN, version_key(version)))
+        return _normalize((MIN, _make_key(version.epoch, version.release, version.pre, version.post, 0)))
+    if operator in ('==', '!='):
+        lower = version_key(version)
+        if version.local is not None:
+            upper = lower + (0, )
+        else:
+            upper = _successor(version)
+        if operator == '==':
+            return _normalize((lower, upper))
+        return _normalize((MIN, lower, upper))
+    if operator == '~=':
+        lower = version_key(version)
+        _, upper = _prefix_bounds(version.epoch, version.release[:-1])
+        return _normalize((lower, upper))
+    raise ValueError('unsupported operator: {}'.format(operator))
+
+
+def key_to_version(key: BoundKey, names: dict[BoundKey, str] | None = None) -> str | None:
+    """Convert the key back into a version string.
+
+    Returns None for synthetic keys that do not belong to any version.
+    The original spelling of the version is taken from `names` if possible.
+    """
+    if names:
+        name = names.get(key)
+        if name is not None:
+            return name
+    if len(key) != 9 or key[4] == 2:
+        return None
+    epoch, release, pre_rank, pre, post_rank, post, dev_rank, dev, local = key
+    version = '.'.join(map(str, release))
+    if epoch:
+        version = '{}!{}'.format(epoch, version)
+    if pre_rank in PRE_NAMES:
+        version += PRE_NAMES[pre_rank] + str(pre)
+    if post_rank:
+        version += '.post' + str(post)
+    if not dev_rank:
+        version += '.dev' + str(dev)
+    if local:
+        version += '+' + '.'.join(str(part) for _, part in local)
+    return version
+
+
+def _render_version(key: BoundKey, names: dict) -> str:
+    """The same as `key_to_version` but for a key that belongs to a version.
+    """
+    version = key_to_version(key, names)
+    assert version is not None, key
+    return version
+
+
+def _key_successor(key: BoundKey) -> BoundKey:
+    """The same as `_successor` but for a key of version without local segment.
+    """
+    if not key[6]:
+        return key[:7] + (key[7] + 1, ())
+    if key[4]:
+        return key[:4] + (1, key[5] + 1, 0, 0, ())
+    return key[:4] + (1, 0, 0, 0, ())
+
+
+def _is_dev0(key: BoundKey) -> bool:
+    """Check if the key is `X.dev0` where `X` is a final release.
+    """
+    return len(key) == 9 and key[2:] == (0, 0, 0, 0, 0, 0, ())
+
+
+def _star_prefix(lower: BoundKey, upper: BoundKey) -> tuple[int, ...] | None:
+    """Find the prefix for `[lower, upper)` interval like `==1.2.*`.
+    """
+    if lower[0] != upper[0] or not _is_dev0(lower) or not _is_dev0(upper):
+        return None
+    release, next_release = lower[1], upper[1]
+    size = len(next_release)
+    if size < len(release):
+        return None
+    prefix = release + (0, ) * (size - len(release))
+    if prefix[:-1] != next_release[:-1] or prefix[-1] + 1 != next_release[-1]:
+        return None
+    return prefix
+
+
+def _render_hole(upper: BoundKey, lower: BoundKey, names: dict) -> str | None:
+    """Render the gap `[upper, lower)` between two intervals as `!=` constraint.
+    """
+    if len(upper) != 9 or upper[4] == 2:
+        return None
+    if upper[8]:
+        if lower == upper + (0, ):
+            return '!=' + _render_version(upper, names)
+        return None
+    if lower == _key_successor(upper):
+        return '!=' + _render_version(upper, names)
+    prefix = _star_prefix(upper, lower)
+    if prefix is not None:
+        return '!={}.*'.format(_render_release(upper[0], prefix))
+    return None
+
+
+def _render_release(epoch: int, release: tuple[int, ...]) -> str:
+    version = '.'.join(map(str, release))
+    if epoch:
+        version = '{}!{}'.format(epoch, version)
+    return version
+
+
+def _render_lower(key: BoundKey, names: dict, approximate: bool) -> list[str] | None:
+    if key == MIN:
+        return []
+    if key[4] == 2:
+        return ['>' + _render_version(key[:4] + (0, 0, 1, 0, ()), names)]
+    if len(key) == 9 and not key[8]:
+        return ['>=' + _render_version(key, names)]
+    # local versions are allowed only in `==` and `!=`
+    if approximate:
+        return ['>=' + _render_version(key[:8] + ((), ), names)]
+    return None
+
+
+def _render_upper(key: BoundKey, names: dict, approximate: bool) -> list[str] | None:
+    if len(key) != 9 or key[8]:
+        if approximate:
+            return ['<=' + _render_version(key[:8] + ((), ), names)]
+        return None
+    # above all post-releases, there is no the least version above them
+    if key[4] == 2:
+        if approximate:
+            return ['<{}.dev0'.format(_render_release(key[0], key[1] + (0, 1)))]
+        return None
+    # `<=1.2` is `<1.2.post0.dev0` and `<=1.2.post1` is `<1.2.post2.dev0`
+    if key[4] and key[6:8] == (0, 0):
+        if key[5]:
+            return ['<=' + _render_version(key[:4] + (1, key[5] - 1, 1, 0, ()), names)]
+        return ['<=' + _render_version(key[:4] + (0, 0, 1, 0, ()), names)]
+    # `<1.2` is `<1.2.dev0`
+    if _is_dev0(key):
+        return ['<' + _render_version(key[:2] + (4, 0, 0, 0, 1, 0, ()), names)]
+    # strict upper bound is exact only for pre-releases
+    version = _render_version(key, names)
+    if not key[6] or key[2] < 4:
+        return ['<' + version]
+    # `<1.2` excludes pre-releases of 1.2, `<=1.2,!=1.2` doesn't
+    return ['<=' + version, '!=' + version]
+
+
+def _render_group(bounds: Sequence[BoundKey], names: dict, approximate: bool) -> list[str] | None:
+    """Render intervals separated only by single versions or star holes.
+    """
+    lower = bounds[0]
+    upper = bounds[-1] if len(bounds) % 2 == 0 else None
+    # single interval that is a single version or a star
+    if len(bounds) == 2 and len(lower) == 9 and lower[4] != 2:
+        if lower[8]:
+            if upper == lower + (0, ):
+                return ['==' + _render_version(lower, names)]
+        elif upper == _key_successor(lower):
+            return ['==' + _render_version(lower, names)]
+        if upper is not None:
+            prefix = _star_prefix(lower, upper)
+            if prefix is not None:
+                return ['=={}.*'.format(_render_release(lower[0], prefix))]
+
+    constraints = _render_lower(lower, names, approximate)
+    if constraints is None:
+        return None
+    for index in range(1, len(bounds) - 1, 2):
+        constraint = _render_hole(bounds[index], bounds[index + 1], names)
+        if constraint is None:
+            return None
+        constraints.append(constraint)
+    if upper is not None:
+        upper_constraints = _render_upper(upper, names, approximate)
+        if upper_constraints is None:
+            return None
+        constraints.extend(upper_constraints)
+    return constraints
+
+
+def _sweep(sequences: Sequence[Sequence[BoundKey]], need: int) -> tuple[BoundKey, ...]:
+    """Combine boundaries of many sets in one pass.
+
+    A version gets into the result if it is in at least `need` sets.
+    So, `need=1` is union and `need=len(sequences)` is intersection.
+    """
+    events: list[tuple[BoundKey, int]] = []
+    # every sequence is sorted, so `sort` just merges them in linear time
+    for bounds in sequences:
+        events.extend((point, 1 - (index & 1) * 2) for index, point in enumerate(bounds))
+    events.sort(key=itemgetter(0))
+
+    result = []
+    inside = 0
+    included = False
+    index = 0
+    while index < len(events):
+        point = events[index][0]
+        while index < len(events) and events[index][0] == point:
+            inside += events[index][1]
+            index += 1
+        if (inside >= need) != included:
+            included = not included
+            result.append(point)
+    return tuple(result)
+
+
+def _to_key(version: Any) -> BoundKey:
+    if isinstance(version, str):
+        version = parse_version(version)
+    return version_key(version)
+
+
+class _SortedKeys:
+    """Lazy view on keys of a sorted sequence of versions.
+
+    Only versions touched by binary search are parsed.
+    """
+    __slots__ = ('versions', 'cache')
+
+    def __init__(self, versions: Sequence) -> None:
+        self.versions = versions
+        self.cache: dict[int, BoundKey] = dict()
+
+    def get(self, index: int) -> BoundKey:
+        key = self.cache.get(index)
+        if key is None:
+            key = self.cache[index] = _to_key(self.versions[index])
+        return key
+
+    def bisect_left(self, key: BoundKey, low: int = 0) -> int:
+        high = len(self.versions)
+        while low < high:
+            middle = (low + high) // 2
+            if self.get(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+class Intervals:
+    """Immutable set of versions compiled into disjoint intervals.
+    """
+    __slots__ = ('bounds', )
+
+    def __init__(self, bounds: Iterable[BoundKey] = ()) -> None:
+        self.bounds = tuple(bounds)
+
+    @classmethod
+    def full(cls) -> Intervals:
+        return cls((MIN, ))
+
+    @classmethod
+    def empty(cls) -> Intervals:
+        return cls()
+
+    def complement(self) -> Intervals:
+        """All versions that are not in the set.
+        """
+        bounds = self.bounds
+        if bounds and bounds[0] == MIN:
+            return type(self)(bounds[1:])
+        return type(self)((MIN, ) + bounds)
+
+    def difference(self, other: Intervals) -> Intervals:
+        return self.intersection(self, other.complement())
+
+    @classmethod
+    def intersection(cls, *sets: Intervals) -> Intervals:
+        if not sets:
+            return cls.full()
+        if len(sets) == 1:
+            return sets[0]
+        return cls(_sweep([item.bounds for item in sets], need=len(sets)))
+
+    @classmethod
+    def union(cls, *sets: Intervals) -> Intervals:
+        if not sets:
+            return cls.empty()
+        if len(sets) == 1:
+            return sets[0]
+        return cls(_sweep([item.bounds for item in sets], need=1))
+
+    def to_constraints(self, names: dict[BoundKey, str] | None = None,
+                       approximate: bool = False) -> list[list[str]] | None:
+        """Render the set as PEP-440 constraints: OR of groups, AND inside a group.
+
+        Intervals separated by a single version or a star are joined in one group
+        by `!=` constraints. The original spelling of versions is taken from `names`
+        if possible.
+
+        Some boundaries have no PEP-440 form: the upper bound above all post-releases
+        (`~(>1.2)`) and bounds next to local versions. Returns None for them,
+        or, if `approximate` is True, widens them: `<1.2.0.1.dev0` and `<=1.2`.
+        """
+        bounds = self.bounds
+        if not bounds:
+            return [['<0']]
+        names = names or dict()
+
+        # split the bounds on groups where gaps are holes
+        groups = []
+        start = 0
+        for index in range(1, len(bounds) - 1, 2):
+            if _render_hole(bounds[index], bounds[index + 1], names) is None:
+                groups.append(bounds[start:index + 1])
+                start = index + 1
+        groups.append(bounds[start:])
+
+        result = []
+        for group in groups:
+            constraints = _render_group(group, names, approximate)
+            if constraints is None:
+                return None
+            result.append(constraints)
+        return result
+
+    def is_empty(self) -> bool:
+        return not self.bounds
+
+    def is_exact(self) -> bool:
+        """Check if the set is a single version (and its local versions).
+        """
+        bounds = self.bounds
+        if len(bounds) != 2:
+            return False
+        lower, upper = bounds
+        if len(lower) != 9 or lower[4] == 2:
+            return False
+        if lower[8]:
+            return upper == lower + (0, )
+        return upper == _key_successor(lower)
+
+    def issubset(self, other: Intervals) -> bool:
+        """Check if every interval of the set is inside of some interval of other set.
+        """
+        bounds = other.bounds
+        for lower, upper in self:
+            index = bisect_right(bounds, lower)
+            if not index & 1:
+                return False
+            if index == len(bounds):
+                continue
+            if upper is None or upper > bounds[index]:
+                return False
+        return True
+
+    def overlaps(self, other: Intervals) -> bool:
+        return not self.intersection(self, other).is_empty()
+
+    def contains_key(self, key: BoundKey) -> bool:
+        return bool(bisect_right(self.bounds, key) & 1)
+
+    def __contains__(self, version: object) -> bool:
+        bounds = self.bounds
+        # don't parse the version if the answer is known
+        if not bounds:
+            return False
+        if bounds == (MIN, ):
+            return True
+        if isinstance(version, str):
+            version = parse_version(version)
+        if not isinstance(version, Version):
+            return False
+        return bool(bisect_right(bounds, version_key(version)) & 1)
+
+    def slices(self, versions: Sequence) -> list[slice]:
+        """Slices of the sorted (ascending) versions that are in the set.
+
+        Every interval costs two binary searches, versions out of the
+        probed positions are not parsed and not compared.
+        """
+        keys = _SortedKeys(versions)
+        result = []
+        start = 0
+        size = len(versions)
+        for lower, upper in self:
+            if start >= size:
+                break
+            if lower != MIN:
+                start = keys.bisect_left(lower, start)
+            stop = size if upper is None else keys.bisect_left(upper, start)
+            if start < stop:
+                result.append(slice(start, stop))
+            start = stop
+        return result
+
+    def __iter__(self) -> Iterator[tuple[BoundKey, BoundKey | None]]:
+        """Iterate over `(lower, upper)` pairs, upper is None for unbounded interval.
+        """
+        bounds = self.bounds
+        for index in range(0, len(bounds), 2):
+            upper = bounds[index + 1] if index + 1 < len(bounds) else None
+            yield bounds[index], upper
+
+    def __len__(self) -> int:
+        return (len(self.bounds) + 1) // 2
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Intervals):
+            return NotImplemented
+        return self.bounds == other.bounds
+
+    def __hash__(self) -> int:
+        return hash(self.bounds)
+
+    def __repr__(self) -> str:
+        return '{name}({count} intervals)'.format(name=type(self).__name__, count=len(self))
@@ -0,0 +1,89 @@
+"""Table of known Python interpreters used by `peppify` and `python_compat`.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from packaging.version import Version
+
+from .cache import LRUCache
+from .constants import PYTHONS
+from .intervals import Intervals, version_key
+
+
+class PythonTable:
+    """Sorted table of interpreter versions.
+
+    Which interpreters match a specifier is found by a single merge
+    of the table with the specifier intervals. Results are cached
+    by intervals, so all equal specifiers share them.
+    """
+
+    def __init__(self, versions: Iterable[str] = PYTHONS, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.set_versions(versions)
+
+    def set_versions(self, versions: Iterable[str]) -> None:
+        """Replace interpreters in the table and drop cached results.
+
+        Versions and caches are replaced at once, so other threads use
+        either the old table or the new one, but never a mix of them.
+        """
+        parsed = tuple(sorted(Version(version) for version in versions))
+        keys = tuple(version_key(version) for version in parsed)
+        # `peppify` results are the last, specifiers must be copied before returning
+        self._state = (parsed, keys, LRUCache(maxsize=self.maxsize), LRUCache(maxsize=self.maxsize))
+
+    def snapshot(self) -> PythonTable:
+        """Table sharing the current versions and caches, not affected by `set_versions`.
+        """
+        new = object.__new__(type(self))
+        new.maxsize = self.maxsize
+        new._state = self._state
+        return new
+
+    @property
+    def versions(self) -> tuple[Version, ...]:
+        return self._state[0]
+
+    @property
+    def keys(self) -> tuple[tuple, ...]:
+        return self._state[1]
+
+    @property
+    def cache(self) -> LRUCache:
+        return self._state[2]
+
+    @property
+    def specifiers(self) -> LRUCache:
+        return self._state[3]
+
+    def mask(self, intervals: Intervals) -> tuple[bool, ...]:
+        """For every interpreter in the table check if it is in the intervals.
+        """
+        _, keys, cache, _ = self._state
+        mask = cache.get(intervals)
+        if mask is not None:
+            return mask
+
+        result = []
+        bounds = intervals.bounds
+        index = 0
+        for key in keys:
+            # both sequences are sorted, so the index only goes forward
+            while index < len(bounds) and bounds[index] <= key:
+                index += 1
+            result.append(bool(index & 1))
+        mask = tuple(result)
+        cache.set(intervals, mask)
+        return mask
+
+    def __repr__(self) -> str:
+        return '{name}({versions})'.format(
+            name=type(self).__name__,
+            versions=', '.join(map(str, self.versions)),
+        )
+
+
+# the table used by default, call `PYTHON_TABLE.set_versions` to change it
+PYTHON_TABLE = PythonTable()
@@ -1,54 +1,182 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable
+from copy import copy
+from typing import Any, Iterable, Iterator, Sequence, cast
 
 from packaging.specifiers import InvalidSpecifier
-from packaging.version import Version, parse
+from packaging.version import Version
 
-from .constants import OPERATOR_SYMBOLS, PYTHONS, JoinTypes
+from .cache import RANGE_CACHE, parse_version
+from .constants import OPERATOR_SYMBOLS, JoinTypes
 from .git_specifier import GitSpecifier
+from .intervals import BoundKey, Intervals, version_key
+from .pythons import PYTHON_TABLE, PythonTable
+from .releases import ReleaseIndex
 from .specifier import Specifier
+from .tokenizer import tokenize
 
 
-REX_MAVEN_INTERVAL = re.compile(r'([\]\)])\,([\[\(])')
-REX_TRIM_OPERATOR = re.compile(r'([{}])\s+'.format(re.escape(OPERATOR_SYMBOLS)))
+# characters that can be in a specifier, used to validate lazy specifiers
+REX_LAZY = re.compile(r'[\w\s.*!=<>~^|,\[\]()+\-]*')
+
+
+# more conjunctions are not flattened, the tree is evaluated as is
+MAX_CONJUNCTIONS = 64
+
+
+def _unique(specs: Iterable) -> tuple:
+    """Drop duplicates preserving the order.
+    """
+    return tuple(dict.fromkeys(specs))
+
+
+def _timed(atom: object) -> tuple:
+    # `Specifier` equality ignores attached time, but the check depends on it
+    return atom, getattr(atom, 'time', None)
 
 
 class RangeSpecifier:
-    _specs: set
-    join_type: JoinTypes
+    __slots__ = ('_specs', 'join_type', '_compiled', '_key', '_str', '_raw', '_flat', '_parts')
 
-    def __init__(self, spec: object | None = None) -> None:
+    # immutable and can be shared with other instances
+    _specs: tuple
+    join_type: JoinTypes
+    # compiled intervals, None if not compiled yet, False if cannot be compiled
+    _compiled: Intervals | bool | None
+    # canonical form and text, None if not computed yet
+    _key: object
+    _str: str | None
+    # not parsed string of lazy specifier, None if parsed
+    _raw: str | None
+    # specifiers of not yet done `+`, None if there is nothing to merge
+    _parts: tuple[RangeSpecifier, ...] | None
+    # OR of `[hits, atoms]` conjunctions, None if not built, False if too large
+    _flat: tuple[list, ...] | bool | None
+
+    def __init__(self, spec: object | None = None, *, lazy: bool = False) -> None:
+        """Parse the specifier.
+
+        If `lazy` is True, a string is only checked for unexpected characters,
+        and parsed on the first access to the constraints (`in`, `+`, `str`,
+        `to_marker`, `peppify` etc.). Invalid constraints raise there.
+        """
+        self._compiled = None
+        self._key = None
+        self._str = None
+        self._raw = None
+        self._flat = None
+        self._parts = None
         if not spec:
-            self._specs = set()
+            self._specs = ()
             self.join_type = JoinTypes.AND
             return
 
-        # split `>2 || <1` on `>2` and `<1`
-        subspecs = str(spec).split('||')
-        if len(subspecs) > 1:
-            self._specs = {type(self)(subspec) for subspec in subspecs}
-            self.join_type = JoinTypes.OR
+        if lazy and isinstance(spec, str) and not (RANGE_CACHE.enabled and spec in RANGE_CACHE):
+            if REX_LAZY.fullmatch(spec) is None:
+                raise InvalidSpecifier(spec)
+            # `_specs` and `join_type` are not set, so `__getattr__` parses them
+            self._raw = spec
             return
 
-        # split `(,1),(2,)` on `(,1)` and `(2,)`
-        subspecs = REX_MAVEN_INTERVAL.sub(r'\1|\2', str(spec)).split('|')
-        if len(subspecs) > 1:
-            self._specs = {type(self)(subspec) for subspec in subspecs}
-            self.join_type = JoinTypes.OR
-            return
+        self._specs, self.join_type = self._parse_cached(spec)
+
+    @classmethod
+    def _parse_cached(cls, spec: object) -> tuple[tuple, JoinTypes]:
+        # parsed specs are shared between all instances with the same string
+        if isinstance(spec, str) and RANGE_CACHE.enabled:
+            cached = RANGE_CACHE.get(spec)
+            if cached is None:
+                cached = cls._parse_spec(spec)
+                RANGE_CACHE.set(spec, cached)
+            return cached
+        return cls._parse_spec(spec)
+
+    def __getattr__(self, name: str) -> Any:
+        # called only if the attribute isn't set:
+        # parse the lazy specifier or merge deferred parts
+        # (another thread can do it at the same time, so values are read once)
+        if name in ('_specs', 'join_type'):
+            raw = self._raw
+            if raw is not None:
+                self._specs, self.join_type = self._parse_cached(raw)
+                self._raw = None
+                return getattr(self, name)
+            parts = self._parts
+            if parts is not None:
+                self._merge_parts(parts)
+                return getattr(self, name)
+            # another thread has set the attribute after the lookup failed
+            return object.__getattribute__(self, name)
+        raise AttributeError(name)
+
+    @classmethod
+    def _deferred(cls, parts: tuple[RangeSpecifier, ...]) -> RangeSpecifier:
+        """Merge of the specifiers that is done on the first access to the constraints.
 
-        self._specs = self._parse(spec)
-        self.join_type = JoinTypes.AND
-        return
+        Membership and intervals are found from the parts without merging.
+        """
+        new = cls.__new__(cls)
+        new._reset()
+        new._raw = None
+        new._parts = parts
+        return new
+
+    def _merge_parts(self, parts: tuple[RangeSpecifier, ...]) -> None:
+        result = parts[0].copy()
+        for part in parts[1:]:
+            result._attach(part)
+        self._specs, self.join_type = result._specs, result.join_type
+        self._parts = None
+
+    def _as_parts(self) -> tuple[RangeSpecifier, ...]:
+        # copy, so changes of the specifier don't affect the deferred merge
+        parts = self._parts
+        if parts is not None:
+            return parts
+        return (self.copy(), )
+
+    @classmethod
+    def _parse_spec(cls, spec: object) -> tuple[tuple, JoinTypes]:
+        if isinstance(spec, (list, tuple)):
+            return cls._parse(spec), JoinTypes.AND
+
+        # `>2 || <1` is split on `>2` and `<1`
+        alternatives = tokenize(str(spec))
+        if len(alternatives) > 1:
+            children = (cls._from_parsed(*cls._parse_alternatives(groups)) for groups in alternatives)
+            return _unique(children), JoinTypes.OR
+        return cls._parse_alternatives(alternatives[0])
+
+    @classmethod
+    def _parse_alternatives(cls, groups: list[list[str]]) -> tuple[tuple, JoinTypes]:
+        # `(,1),(2,)` is split on `(,1)` and `(2,)`
+        if len(groups) > 1:
+            children = (cls._from_parsed(cls._parse_constraints(group), JoinTypes.AND) for group in groups)
+            return _unique(children), JoinTypes.OR
+        return cls._parse_constraints(groups[0]), JoinTypes.AND
+
+    @classmethod
+    def _from_parsed(cls, specs: tuple, join_type: JoinTypes) -> RangeSpecifier:
+        new = cls()
+        new._specs = specs
+        new.join_type = join_type
+        return new
+
+    @classmethod
+    def _parse(cls, spec: object) -> tuple[Specifier, ...]:
+        if isinstance(spec, (list, tuple)):
+            constraints = [cls._clean_constraint(constr) for constr in spec]
+        else:
+            constraints = [constr for groups in tokenize(str(spec)) for group in groups for constr in group]
+        return cls._parse_constraints(constraints)
 
     @classmethod
-    def _parse(cls, spec: object) -> set[Specifier]:
-        spec = cls._split_specifier(spec)
-        result = set()
-        for constr in spec:
-            constr = cls._clean_constraint(constr)
+    def _parse_constraints(cls, constraints: Iterable[str]) -> tuple[Specifier, ...]:
+        """Convert cleaned constraints into specifiers.
+        """
+        result: list[Specifier] = []
+        for constr in constraints:
             if not constr:
                 continue
             # parse npm's version range (`1.2.3 - 2.3.0`)
@@ -56,44 +184,24 @@ class RangeSpecifier:
                 if '.*' in constr:
                     raise InvalidSpecifier('cannot mix ranges and starred notation')
                 left, right = constr.split(' - ', maxsplit=1)
-                result.add(Specifier('>=' + left))
-                result.add(Specifier('<=' + right))
+                result.append(Specifier.interned('>=' + left))
+                result.append(Specifier.interned('<=' + right))
                 continue
             # parse mixed stars and operators like `<=1.2.*`
             if constr[0] in '<>' and '.*' in constr:
-                result.add(cls._parse_star_and_operator(constr))
+                result.append(cls._parse_star_and_operator(constr))
                 continue
             # parse npm-style semver specifiers
             if constr[0] in '~^':
-                result.update(cls._parse_npm(constr))
+                result.extend(cls._parse_npm(constr))
                 continue
             # parse maven-style interval specifiers
             if constr[0] in '[(' or constr[-1] in ')]':
-                result.update(cls._parse_maven(constr))
+                result.extend(cls._parse_maven(constr))
                 continue
             # parse classic python specifier
-            result.add(Specifier(constr))
-        return result
-
-    @staticmethod
-    def _split_specifier(spec: object) -> list[str]:
-        if isinstance(spec, (list, tuple)):
-            return list(spec)
-        spec = str(spec)
-
-        # pep-style comma-separated
-        if ',' in spec:
-            return spec.split(',')
-
-        # single specifier
-        spec = REX_TRIM_OPERATOR.sub(r'\1', spec)
-        if ' ' not in spec:
-            return [spec]
-
-        # npm-style space-separated
-        spec = spec.replace(' - ', '|').split()
-        spec = [constr.replace('|', ' - ') for constr in spec]
-        return spec
+            result.append(Specifier.interned(constr))
+        return _unique(result)
 
     @staticmethod
     def _clean_constraint(constr: str) -> str:
@@ -118,32 +226,36 @@ class RangeSpecifier:
 
     @staticmethod
     def _parse_star_and_operator(constr: str) -> Specifier:
-        if constr[:2] in {'<', '>', '>='}:
-            return Specifier(constr.replace('.*', '.0'))
+        operator = constr[:2] if constr[1] == '=' else constr[0]
+        if operator in {'<', '>='}:
+            return Specifier.interned(constr.replace('.*', '.0'))
 
-        version = parse(constr.lstrip(OPERATOR_SYMBOLS).rstrip('.*'))
+        version = parse_version(constr.lstrip(OPERATOR_SYMBOLS).rstrip('.*'))
         parts = version.release[:-1] + (version.release[-1] + 1, )
-        return Specifier(constr[:2] + '.'.join(map(str, parts)))
+        # `>1.2.*` is `>=1.3`
+        if operator == '>':
+            operator = '>='
+        return Specifier.interned(operator + '.'.join(map(str, parts)))
 
     @staticmethod
     def _parse_maven(constr: str) -> set[Specifier]:
         if constr in '[]()':
             return set()
         if constr[0] == '[' and constr[-1] == ']':
-            return {Specifier('==' + constr[1:-1])}
+            return {Specifier.interned('==' + constr[1:-1])}
         if constr[0] == '[':
-            return {Specifier('>=' + constr[1:])}
+            return {Specifier.interned('>=' + constr[1:])}
         if constr[0] == '(':
-            return {Specifier('>' + constr[1:])}
+            return {Specifier.interned('>' + constr[1:])}
         if constr[-1] == ']':
-            return {Specifier('<=' + constr[:-1])}
+            return {Specifier.interned('<=' + constr[:-1])}
         if constr[-1] == ')':
-            return {Specifier('<' + constr[:-1])}
+            return {Specifier.interned('<' + constr[:-1])}
         raise ValueError('non maven constraint: {}'.format(constr))
 
     @staticmethod
     def _parse_npm(constr: str) -> set[Specifier]:
-        version = parse(constr.lstrip(OPERATOR_SYMBOLS).replace('.*', '.0'))
+        version = parse_version(constr.lstrip(OPERATOR_SYMBOLS).replace('.*', '.0'))
         parts = version.release + (0, 0)
         parts = tuple(map(str, parts))
 
@@ -169,17 +281,139 @@ class RangeSpecifier:
         left = '.'.join(parts[:3])
         if version.pre:
             left += '.' + ''.join(map(str, version.pre))
-        return {Specifier('>=' + left), Specifier('==' + right)}
+        return {Specifier.interned('>=' + left), Specifier.interned('==' + right)}
+
+    def compile(self) -> Intervals:
+        """Convert the specifier into sorted disjoint version intervals.
 
-    def attach_time(self, releases: Iterable) -> bool:
+        Raises ValueError if the specifier contains constraints that cannot be
+        represented as intervals: git specifier or arbitrary equality (`===`).
+        """
+        intervals = self._intervals
+        if intervals is None:
+            raise ValueError('cannot compile specifier: {}'.format(self))
+        return intervals
+
+    @property
+    def _intervals(self) -> Intervals | None:
+        # read once, the value can be published by another thread at the same time
+        compiled = self._compiled
+        if compiled is None:
+            intervals = self._compile()
+            compiled = self._compiled = False if intervals is None else intervals
+        if compiled is False:
+            return None
+        return cast(Intervals, compiled)
+
+    def _compile(self) -> Intervals | None:
+        sets = []
+        parts = self._parts
+        if parts is not None:
+            # intersection of the parts is the same as the intersection of the merged specifier
+            for part in parts:
+                intervals = part._intervals
+                if intervals is None:
+                    return None
+                sets.append(intervals)
+            return Intervals.intersection(*sets)
+
+        for spec in self._specs:
+            if isinstance(spec, GitSpecifier):
+                return None
+            intervals = spec._intervals
+            if intervals is None:
+                return None
+            sets.append(intervals)
+        if self.join_type == JoinTypes.AND:
+            return Intervals.intersection(*sets)
+        return Intervals.union(*sets)
+
+    def is_empty(self) -> bool:
+        """Check if no version can match the specifier.
+        """
+        return self.compile().is_empty()
+
+    def is_exact(self) -> bool:
+        """Check if the specifier matches only one version (and its local versions).
+        """
+        return self.compile().is_exact()
+
+    def issubset(self, other: RangeSpecifier) -> bool:
+        """Check if all versions matching the specifier match other specifier too.
+        """
+        return self.compile().issubset(other.compile())
+
+    def overlaps(self, other: RangeSpecifier) -> bool:
+        """Check if there is a version matching both specifiers.
+        """
+        return self.compile().overlaps(other.compile())
+
+    def filter(self, versions: Sequence) -> list:
+        """Returns versions that match the specifier.
+
+        Versions must be sorted in ascending order.
+        """
+        intervals = self._intervals
+        if intervals is None:
+            return [version for version in versions if version in self]
+        result: list = []
+        for part in intervals.slices(versions):
+            result.extend(versions[part])
+        return result
+
+    def max_satisfying(self, versions: Sequence):
+        """Returns the highest version that matches the specifier.
+
+        Versions must be sorted in ascending order.
+        """
+        intervals = self._intervals
+        if intervals is None:
+            for version in reversed(versions):
+                if version in self:
+                    return version
+            return None
+        slices = intervals.slices(versions)
+        if not slices:
+            return None
+        return versions[slices[-1].stop - 1]
+
+    def min_satisfying(self, versions: Sequence):
+        """Returns the lowest version that matches the specifier.
+
+        Versions must be sorted in ascending order.
+        """
+        intervals = self._intervals
+        if intervals is None:
+            for version in versions:
+                if version in self:
+                    return version
+            return None
+        slices = intervals.slices(versions)
+        if not slices:
+            return None
+        return versions[slices[0].start]
+
+    def attach_time(self, releases: Iterable | ReleaseIndex) -> bool:
         """Attach time to all specifiers if possible
+
+        Releases are indexed once for all specifiers. Pass `ReleaseIndex`
+        to reuse the index between calls.
         """
+        index = ReleaseIndex.from_releases(releases)
+        # specifiers can be shared with other instances,
+        # so time is attached to copies of them.
         ok = False
+        specs = []
         for spec in self._specs:
-            if spec.time is None:
-                attached = spec.attach_time(releases)
+            if hasattr(spec, 'attach_time') and getattr(spec, 'time', None) is None:
+                spec = copy(spec)
+                attached = spec.attach_time(index)
                 if attached:
                     ok = True
+            specs.append(spec)
+        if ok:
+            self._specs = tuple(specs)
+            self._reset()
         return ok
 
     def to_marker(self, name: str, *, wrap: bool = False) -> str:
@@ -192,64 +426,88 @@ class RangeSpecifier:
         return marker
 
     def copy(self) -> RangeSpecifier:
+        if self._raw is not None:
+            return type(self)(self._raw, lazy=True)
+        parts = self._parts
+        if parts is not None:
+            new = self._deferred(parts)
+            new._compiled = self._compiled
+            return new
         new = type(self)()
-        new._specs = self._specs.copy()
+        new._specs = self._specs
         new.join_type = self.join_type
+        new._compiled = self._compiled
+        new._key = self._key
+        new._str = self._str
         return new
 
-    def peppify(self) -> RangeSpecifier:
+    def peppify(self, pythons: PythonTable | None = None) -> RangeSpecifier:
         """Returns python specifier without `||`
+
+        Known interpreters are taken from `pythons` or `PYTHON_TABLE`.
         """
         if self.join_type == JoinTypes.AND:
             return self
-        pythons = sorted(Version(python) for python in PYTHONS)
-
-        # get left boundary
-        left = None
-        for python in pythons:
-            if python in self:
-                left = python
-                break
-
-        # get right boundary
-        right = None
-        excluded = []
-        for python in pythons:
-            if python in self:
-                right = python
-            elif left is None or python > left:
-                excluded.append(python)
-        if right is not None:
-            right = (pythons + [None])[pythons.index(right) + 1]
+        if pythons is None:
+            pythons = PYTHON_TABLE
+        # versions and cached results must be from the same table
+        pythons = pythons.snapshot()
+        intervals = self._intervals
+        if intervals is None:
+            return self._peppify(pythons)
+        cached = pythons.specifiers.get(intervals)
+        if cached is None:
+            cached = self._peppify(pythons)
+            pythons.specifiers.set(intervals, cached)
+        return cached.copy()
+
+    def _peppify(self, pythons: PythonTable) -> RangeSpecifier:
+        versions = pythons.versions
+        mask = self._pythons_mask(pythons)
+
+        # get left and right boundaries
+        inside = [index for index, ok in enumerate(mask) if ok]
+        left = right = None
+        if inside:
+            left = inside[0]
+            if inside[-1] + 1 < len(versions):
+                right = inside[-1] + 1
 
         # get excluded intervals
-        if right is not None:
-            excluded = [python for python in excluded if python < right]
-        excluded = ','.join('!={}.*'.format(python) for python in excluded)
+        start = 0 if left is None else left
+        stop = len(versions) if right is None else right
+        excluded = ','.join(
+            '!={}.*'.format(versions[index])
+            for index in range(start, stop) if not mask[index]
+        )
         if excluded:
             excluded = ',' + excluded
 
-        # combine it into specifier
-        if left is None and right is None:
-            return type(self)(excluded[1:])
+        # combine it into specifier, there is no right boundary without the left one
         if left is None:
-            return type(self)('<' + str(right) + excluded)
+            return type(self)(excluded[1:])
         if right is None:
-            return type(self)('>=' + str(left) + excluded)
-        return type(self)('>={},<{}'.format(left, right) + excluded)
+            return type(self)('>=' + str(versions[left]) + excluded)
+        return type(self)('>={},<{}'.format(versions[left], versions[right]) + excluded)
+
+    def _pythons_mask(self, pythons: PythonTable) -> tuple[bool, ...]:
+        intervals = self._intervals
+        if intervals is None:
+            return tuple(version in self for version in pythons.versions)
+        return pythons.mask(intervals)
 
     # properties
 
     @property
     def python_compat(self) -> bool:
-        for version in PYTHONS:
-            if version in self:
-                return True
-        return False
+        return any(self._pythons_mask(PYTHON_TABLE))
 
     # magic methods
 
     def __add__(self, other: object) -> RangeSpecifier:
+        # the merge is deferred, so checking the result and dropping it is cheap
+        if isinstance(other, type(self)):
+            return self._deferred(self._as_parts() + other._as_parts())
         new = self.copy()
         attached = new._attach(other)
         if attached:
@@ -269,28 +527,64 @@ class RangeSpecifier:
             return self
         return NotImplemented
 
+    # set algebra. The result is exact for the `in` operator, the text form
+    # can be a bit wider if a boundary has no PEP-440 form (see `Intervals.to_constraints`).
+    # Attached time is ignored.
+
+    def __and__(self, other: object) -> RangeSpecifier:
+        if not isinstance(other, RangeSpecifier):
+            return NotImplemented
+        return self._algebra(Intervals.intersection(self.compile(), other.compile()), other)
+
+    def __or__(self, other: object) -> RangeSpecifier:
+        if not isinstance(other, RangeSpecifier):
+            return NotImplemented
+        return self._algebra(Intervals.union(self.compile(), other.compile()), other)
+
+    def __sub__(self, other: object) -> RangeSpecifier:
+        if not isinstance(other, RangeSpecifier):
+            return NotImplemented
+        return self._algebra(self.compile().difference(other.compile()), other)
+
+    def __invert__(self) -> RangeSpecifier:
+        return self._algebra(self.compile().complement())
+
+    def _reset(self) -> None:
+        """Drop values computed from `_specs`, must be called on every mutation.
+        """
+        self._compiled = None
+        self._key = None
+        self._str = None
+        self._flat = None
+
     def _attach(self, other: object) -> bool:
+        self._reset()
         if isinstance(other, GitSpecifier):
-            self._specs.add(other)
+            self._specs = _unique(self._specs + (other, ))
             return True
         if not isinstance(other, type(self)):
             return False
 
         # and + and
         if self.join_type == other.join_type == JoinTypes.AND:
-            self._specs.update(other._specs)
+            self._specs = _unique(self._specs + other._specs)
+            return True
+
+        # any combination with `or` can grow exponentially,
+        # so it's converted into a minimal union of intervals if possible
+        if self._simplify(other):
             return True
 
         # and + or
         if self.join_type == JoinTypes.AND:
             and_specs = self._specs
             or_specs = other._specs
-            new_specs = set()
+            new_specs = []
             for or_spec in or_specs:
                 new = type(self)()
-                new._specs = {or_spec} | and_specs
-                new_specs.add(new)
-            self._specs = new_specs
+                new._specs = _unique((or_spec, ) + and_specs)
+                new_specs.append(new)
+            self._specs = _unique(new_specs)
             self.join_type = JoinTypes.OR
             return True
 
@@ -298,35 +592,257 @@ class RangeSpecifier:
         if other.join_type == JoinTypes.AND:
             and_specs = other._specs
             or_specs = self._specs
-            new_specs = set()
+            new_specs = []
             for or_spec in or_specs:
                 new = type(self)()
-                new._specs = {or_spec} | and_specs
-                new_specs.add(new)
-            self._specs = new_specs
+                new._specs = _unique((or_spec, ) + and_specs)
+                new_specs.append(new)
+            self._specs = _unique(new_specs)
             return True
 
         # or + or
         left_specs = self._specs
         right_specs = other._specs
-        new_specs = set()
+        new_specs = []
         for left_spec in left_specs:
             for right_spec in right_specs:
                 new = type(self)()
-                new._specs = {left_spec, right_spec}
-                new_specs.add(new)
-        self._specs = new_specs
+                new._specs = _unique((left_spec, right_spec))
+                new_specs.append(new)
+        self._specs = _unique(new_specs)
         return True
 
+    @classmethod
+    def merge_all(cls, specs: Iterable) -> RangeSpecifier:
+        """Merge all specifiers, the same as adding them one by one.
+
+        Boundaries of all specifiers are intersected in a single pass,
+        and the result is rendered from the intersection. Specifiers that
+        cannot be compiled or have attached time, and git specifiers,
+        are merged by the `+` rules.
+        """
+        specs = list(specs)
+        for spec in specs:
+            if not isinstance(spec, (cls, GitSpecifier)):
+                raise TypeError('cannot merge {!r}'.format(spec))
+        ranges = [spec for spec in specs if isinstance(spec, cls)]
+
+        if ranges and len(ranges) == len(specs):
+            atoms = [atom for spec in ranges for atom in spec._atoms()]
+            if not any(getattr(atom, 'time', None) is not None for atom in atoms):
+                sets = [spec._intervals for spec in ranges]
+                compiled = [intervals for intervals in sets if intervals is not None]
+                if len(compiled) == len(sets):
+                    new = cls._from_intervals(Intervals.intersection(*compiled), names=cls._names(atoms))
+                    if new is not None:
+                        return new
+
+        # git specifiers before the first range specifier are added to it, as `__radd__` does
+        position = next((index for index, spec in enumerate(specs) if isinstance(spec, cls)), None)
+        if position is None:
+            # only git specifiers, they are kept in an empty specifier
+            result = cls()
+        else:
+            result = specs.pop(position).copy()
+        for spec in specs:
+            result._attach(spec)
+        return result
+
+    def _atoms(self) -> Iterator:
+        stack = [iter(self._specs)]
+        while stack:
+            for spec in stack[-1]:
+                if isinstance(spec, RangeSpecifier):
+                    stack.append(iter(spec._specs))
+                    break
+                yield spec
+            else:
+                stack.pop()
+
+    def _flatten(self) -> tuple[list, ...] | None:
+        """Convert the tree into OR of conjunctions of atoms.
+
+        Returns None if there are more than `MAX_CONJUNCTIONS` conjunctions.
+        """
+        # post-order traversal, `results` has OR of conjunctions for every visited node
+        stack: list[tuple[object, bool]] = [(self, False)]
+        results: list[tuple[tuple, ...]] = []
+        while stack:
+            node, visited = stack.pop()
+            if not isinstance(node, RangeSpecifier):
+                results.append(((node, ), ))
+                continue
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node._specs))
+                continue
+
+            start = len(results) - len(node._specs)
+            children = results[start:]
+            del results[start:]
+            if node.join_type == JoinTypes.OR:
+                result = tuple(conj for child in children for conj in child)
+            else:
+                result = ((), )
+                for child in children:
+                    result = tuple(
+                        tuple({_timed(atom): atom for atom in left + right}.values())
+                        for left in result for right in child
+                    )
+                    if len(result) > MAX_CONJUNCTIONS:
+                        return None
+            if len(result) > MAX_CONJUNCTIONS:
+                return None
+            results.append(tuple({tuple(map(_timed, conj)): conj for conj in result}.values()))
+
+        # git specifier is the cheapest and the most selective check
+        return tuple(
+            [0, tuple(sorted(conj, key=lambda atom: not isinstance(atom, GitSpecifier)))]
+            for conj in results[0]
+        )
+
+    def _contains_flat(self, release: object, flat: tuple[list, ...]) -> bool:
+        for position, entry in enumerate(flat):
+            for atom in entry[1]:
+                if release not in atom:
+                    break
+            else:
+                entry[0] += 1
+                # move conjunctions that match more often to the beginning.
+                # The order is changed by replacing the tuple, so concurrent
+                # checks iterate over a consistent one.
+                if position and entry[0] > flat[position - 1][0]:
+                    new = list(flat)
+                    new[position - 1], new[position] = entry, flat[position - 1]
+                    self._flat = tuple(new)
+                return True
+        return False
+
+    def _simplify(self, other: RangeSpecifier) -> bool:
+        """Replace specifiers by a minimal union of intervals matching both specifiers.
+
+        Returns False if the specifiers cannot be compiled, have attached time
+        (it is compared by time, not by version), or the result has no exact
+        PEP-440 form.
+        """
+        atoms = list(self._atoms()) + list(other._atoms())
+        if any(getattr(atom, 'time', None) is not None for atom in atoms):
+            return False
+        left = self._intervals
+        right = other._intervals
+        if left is None or right is None:
+            return False
+        intervals = Intervals.intersection(left, right)
+        new = self._from_intervals(intervals, names=self._names(atoms))
+        # paranoid check that nothing is lost in rendering
+        if new is None or new._compile() != intervals:
+            return False
+        self._specs = new._specs
+        self.join_type = new.join_type
+        self._compiled = intervals
+        return True
+
+    @staticmethod
+    def _names(atoms: Iterable) -> dict:
+        """Original spelling of versions in the specifiers.
+        """
+        names: dict[BoundKey, str] = dict()
+        for atom in atoms:
+            if not atom.raw_version.endswith('*'):
+                names.setdefault(version_key(atom.version), atom.raw_version)
+        return names
+
+    @classmethod
+    def _from_intervals(cls, intervals: Intervals, names: dict | None = None,
+                        approximate: bool = False) -> RangeSpecifier | None:
+        groups = intervals.to_constraints(names, approximate=approximate)
+        if groups is None:
+            return None
+        children = tuple(
+            cls._from_parsed(_unique(Specifier.interned(constr) for constr in group), JoinTypes.AND)
+            for group in groups
+        )
+        if len(children) == 1:
+            new = children[0]
+        else:
+            new = cls._from_parsed(_unique(children), JoinTypes.OR)
+        new._compiled = intervals
+        return new
+
+    def _algebra(self, intervals: Intervals, *others: RangeSpecifier) -> RangeSpecifier:
+        atoms = list(self._atoms())
+        for other in others:
+            atoms.extend(other._atoms())
+        new = self._from_intervals(intervals, names=self._names(atoms), approximate=True)
+        assert new is not None
+        return new
+
     def __contains__(self, release: object) -> bool:
+        if isinstance(release, (str, Version)):
+            intervals = self._intervals
+            if intervals is not None:
+                return release in intervals
+
+        parts = self._parts
+        if parts is not None:
+            return all(release in part for part in parts)
+        flat = self._flat
+        if flat is None:
+            flat = self._flat = self._flatten() or False
+        if flat is not False:
+            return self._contains_flat(release, cast(tuple, flat))
         rule = all if self.join_type == JoinTypes.AND else any
         return rule((release in specifier) for specifier in self._specs)
 
+    def __getstate__(self) -> tuple:
+        return self._specs, self.join_type
+
+    def __setstate__(self, state: tuple) -> None:
+        self._specs, self.join_type = state
+        self._raw = None
+        self._parts = None
+        self._reset()
+
+    def __copy__(self) -> RangeSpecifier:
+        return self.copy()
+
+    def _canonical(self) -> object:
+        """Normalized form of the tree, equal for structurally equal specifiers.
+
+        The order of specifiers doesn't matter, versions are compared
+        as versions (`>=1` and `>=1.0` are the same), nested groups
+        with the same join type are flattened, and a group of one
+        specifier is the specifier itself.
+        """
+        if self._key is not None:
+            return self._key
+        items: set = set()
+        for spec in self._specs:
+            if isinstance(spec, RangeSpecifier):
+                key = spec._canonical()
+                if type(key) is tuple and key[0] == self.join_type:
+                    items.update(key[1])
+                    continue
+            elif isinstance(spec, GitSpecifier):
+                # git specifier has no state, so all of them are equal
+                key = GitSpecifier
+            else:
+                key = spec
+            items.add(key)
+        if len(items) == 1:
+            self._key = items.pop()
+        else:
+            self._key = (self.join_type, frozenset(items))
+        return self._key
+
     def __str__(self) -> str:
-        if not self._specs:
-            return ''
-        sep = ',' if self.join_type == JoinTypes.AND else ' || '
-        return sep.join(sorted(map(str, self._specs)))
+        if self._str is None:
+            if not self._specs:
+                self._str = ''
+            else:
+                sep = ',' if self.join_type == JoinTypes.AND else ' || '
+                self._str = sep.join(sorted(map(str, self._specs)))
+        return self._str
 
     def __repr__(self) -> str:
         return '{name}({spec})'.format(
@@ -345,7 +861,9 @@ class RangeSpecifier:
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, type(self)):
             return False
-        return str(self) == str(other)
+        if self is other:
+            return True
+        return self._canonical() == other._canonical()
 
     def __hash__(self) -> int:
-        return hash(str(self))
+        return hash(self._canonical())
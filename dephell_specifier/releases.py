@@ -0,0 +1,75 @@
+"""Index of release times to attach them to specifiers.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from packaging.version import InvalidVersion, Version
+
+from .cache import parse_version
+
+
+class ReleaseIndex:
+    """Release times by normalized version (`1.0` and `1.0.0` are the same).
+
+    Build it once and pass into `attach_time` instead of releases list.
+    Releases with unknown time (1970 year) are skipped, the first release
+    wins if there are a few releases with the same version.
+    """
+    __slots__ = ('times', )
+
+    def __init__(self, releases: Iterable = ()) -> None:
+        # `Version` objects are equal and have the same hash if versions are equal
+        self.times: dict[Version, Any] = dict()
+        self.update(releases)
+
+    @classmethod
+    def from_releases(cls, releases: Iterable | ReleaseIndex) -> ReleaseIndex:
+        """Build index from releases, or return it as is if it's already an index.
+        """
+        if isinstance(releases, ReleaseIndex):
+            return releases
+        return cls(releases)
+
+    def update(self, releases: Iterable) -> None:
+        times = self.times
+        for release in releases:
+            time = release.time
+            if time is None or time.year == 1970:
+                continue
+            version = release.version
+            if isinstance(version, str):
+                try:
+                    version = parse_version(version)
+                except InvalidVersion:
+                    continue
+            if version not in times:
+                times[version] = time
+
+    def get(self, version: str) -> Any:
+        """Time of the release with the given version, None if unknown.
+        """
+        try:
+            parsed = parse_version(version)
+        except InvalidVersion:
+            return None
+        return self.times.get(parsed)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __repr__(self) -> str:
+        return '{name}({count} releases)'.format(name=type(self).__name__, count=len(self.times))
+
+
+def attach_times(specifiers: Iterable, releases: Iterable) -> int:
+    """Attach time to all given specifiers using one index of releases.
+
+    Returns how many specifiers got time attached.
+    """
+    index = ReleaseIndex.from_releases(releases)
+    count = 0
+    for specifier in specifiers:
+        if specifier.attach_time(index):
+            count += 1
+    return count
@@ -0,0 +1,192 @@
+"""Compact binary format for parsed specifiers and on-disk cache of them.
+
+The format stores the tree of specifiers (join types and normalized
+constraints) and compiled intervals of the root. So, loading a specifier
+doesn't run the parser and doesn't compile intervals. The tree is encoded
+by `marshal` (like `.pyc` files), so the data can be loaded only by Python
+with the same marshal format, and must come from a trusted source.
+
+Attached time is not stored.
+"""
+from __future__ import annotations
+
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import Any, Iterable, Mapping, Union
+
+from .constants import JoinTypes
+from .git_specifier import GitSpecifier
+from .intervals import Intervals
+from .range_specifier import RangeSpecifier
+from .specifier import Specifier
+
+
+MARSHAL_VERSION = 4
+# the index is stored in the native byte order
+MAGIC = b'DSPC' + bytes([1, MARSHAL_VERSION]) + sys.byteorder[0].encode()
+# magic, number of entries, offset of the index
+HEADER = struct.Struct('<7sQQ')
+# every entry: raw spec size, payload size, raw spec, payload
+ENTRY = struct.Struct('<II')
+
+AnySpecifier = Union[RangeSpecifier, Specifier, GitSpecifier]
+
+
+def _to_tree(spec: object) -> Any:
+    if isinstance(spec, RangeSpecifier):
+        return spec.join_type.value, tuple(_to_tree(child) for child in spec._specs)
+    if isinstance(spec, Specifier):
+        return str(spec)
+    if isinstance(spec, GitSpecifier):
+        return None
+    raise TypeError('cannot serialize {!r}'.format(spec))
+
+
+def _from_tree(tree: Any) -> AnySpecifier:
+    if tree is None:
+        return GitSpecifier()
+    if isinstance(tree, str):
+        return Specifier.interned(tree)
+    join_type, children = tree
+    specs = tuple(_from_tree(child) for child in children)
+    return RangeSpecifier._from_parsed(specs, JoinTypes(join_type))
+
+
+def dumps(spec: object) -> bytes:
+    """Serialize `RangeSpecifier`, `Specifier`, or `GitSpecifier` into bytes.
+    """
+    intervals = getattr(spec, '_intervals', None)
+    bounds = None if intervals is None else intervals.bounds
+    return marshal.dumps((_to_tree(spec), bounds), MARSHAL_VERSION)
+
+
+def loads(data: bytes) -> AnySpecifier:
+    """Restore specifier from bytes returned by `dumps`.
+    """
+    tree, bounds = marshal.loads(data)
+    spec = _from_tree(tree)
+    # git specifiers aren't compiled, so they never have bounds
+    if bounds is not None and not isinstance(spec, GitSpecifier):
+        spec._compiled = Intervals(bounds)
+    return spec
+
+
+# on-disk cache
+
+def _hash(key: str) -> int:
+    # unlike `hash`, it is the same in all processes
+    return int.from_bytes(blake2b(key.encode('utf8'), digest_size=8).digest(), 'little')
+
+
+def write_cache(path: str, specs: Iterable[str] | Mapping[str, RangeSpecifier]) -> int:
+    """Parse specifiers and save them into the file for `DiskCache`.
+
+    Accepts raw specifier strings or a mapping of them on parsed specifiers.
+    Invalid specifiers are skipped. Returns how many specifiers are saved.
+    """
+    if not isinstance(specs, Mapping):
+        parsed = dict()
+        for spec in specs:
+            try:
+                parsed[spec] = RangeSpecifier(spec)
+            except Exception:
+                continue
+        specs = parsed
+
+    body = bytearray()
+    index = []
+    for raw, spec in specs.items():
+        index.append((_hash(raw), HEADER.size + len(body)))
+        raw_data = raw.encode('utf8')
+        payload = dumps(spec)
+        body.extend(ENTRY.pack(len(raw_data), len(payload)))
+        body.extend(raw_data)
+        body.extend(payload)
+    index.sort()
+
+    # the index is aligned to be used as an array of integers without copying
+    body.extend(bytes(-(HEADER.size + len(body)) % 8))
+    with open(path, 'wb') as stream:
+        stream.write(HEADER.pack(MAGIC, len(index), HEADER.size + len(body)))
+        stream.write(body)
+        array('Q', [entry_hash for entry_hash, _ in index]).tofile(stream)
+        array('Q', [offset for _, offset in index]).tofile(stream)
+    return len(index)
+
+
+class DiskCache:
+    """Read-only memory-mapped file of parsed specifiers made by `write_cache`.
+
+    Opening doesn't read the entries. Every lookup is a binary search
+    over the sorted hashes, and only the found entry is deserialized.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as stream:
+            if os.fstat(stream.fileno()).st_size < HEADER.size:
+                raise ValueError('empty or truncated specifiers cache file: {}'.format(path))
+            # the mapping stays valid after the file is closed
+            self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, index = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError('not a specifiers cache file or incompatible format: {}'.format(path))
+        if index + count * 16 > len(self._map):
+            self._map.close()
+            raise ValueError('empty or truncated specifiers cache file: {}'.format(path))
+        view = memoryview(self._map)
+        self._hashes = view[index:index + count * 8].cast('Q')
+        self._offsets = view[index + count * 8:index + count * 16].cast('Q')
+        view.release()
+
+    def get(self, spec: str) -> RangeSpecifier | None:
+        """Deserialize the cached specifier, None if it's not in the cache.
+        """
+        target = _hash(spec)
+        hashes = self._hashes
+        position = bisect_left(hashes, target)
+        raw = spec.encode('utf8')
+        # hashes can collide, so check raw strings
+        while position < len(hashes) and hashes[position] == target:
+            offset = self._offsets[position]
+            raw_size, payload_size = ENTRY.unpack_from(self._map, offset)
+            offset += ENTRY.size
+            if self._map[offset:offset + raw_size] == raw:
+                offset += raw_size
+                return loads(self._map[offset:offset + payload_size])  # type: ignore[return-value]
+            position += 1
+        return None
+
+    def parse(self, spec: str) -> RangeSpecifier:
+        """Get the specifier from the cache or parse it if it's not cached.
+        """
+        result = self.get(spec)
+        if result is None:
+            result = RangeSpecifier(spec)
+        return result
+
+    def close(self) -> None:
+        self._hashes.release()
+        self._offsets.release()
+        self._map.close()
+
+    def __contains__(self, spec: str) -> bool:
+        return self.get(spec) is not None
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __enter__(self) -> DiskCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return '{name}({count} specifiers)'.format(name=type(self).__name__, count=len(self))
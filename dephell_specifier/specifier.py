@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import operator
-from typing import Any, Callable, Iterable
+from typing import Any, Callable, Iterable, cast
 
 from packaging import specifiers
-from packaging.version import Version, parse
+from packaging.version import InvalidVersion, Version
 
-from .utils import cached_property
+from .cache import INTERN_TABLE, SPECIFIER_CACHE, parse_version
+from .intervals import MIN, Intervals, specifier_bounds, version_key
+from .releases import ReleaseIndex
 
 
 OPERATIONS: dict[str, Callable[[Any, Any], bool]] = {
@@ -45,35 +47,142 @@ OPERATORS_MERGE: dict[frozenset[str], str | None] = {
 
 
 class Specifier:
-    time = None
+    __slots__ = ('_spec', 'time', '_version', '_hash', '_compiled', '_checker', '__weakref__')
+
+    _spec: specifiers.Specifier
+    time: Any
+    # lazy computed values, None if not computed yet
+    _version: Version | None
+    _hash: int | None
+    # compiled intervals, False if cannot be compiled
+    _compiled: Intervals | bool | None
+    # checks if the version matches the constraint
+    _checker: Callable[[Version], bool] | None
 
     def __init__(self, constr: object) -> None:
+        self.time = None
+        self._version = None
+        self._hash = None
+        self._compiled = None
+        self._checker = None
+
+        constr = str(constr)
+        if SPECIFIER_CACHE.enabled:
+            spec = SPECIFIER_CACHE.get(constr)
+            if spec is not None:
+                self._spec = spec
+                return
         try:
-            self._spec = specifiers.Specifier(str(constr), prereleases=True)
+            self._spec = specifiers.Specifier(constr, prereleases=True)
         except specifiers.InvalidSpecifier:
             raise specifiers.InvalidSpecifier(constr)
+        SPECIFIER_CACHE.set(constr, self._spec)
 
-    def attach_time(self, releases: Iterable) -> bool:
-        for release in releases:
-            if release.time.year != 1970:
-                if str(release.version) == self._spec.version:
-                    self.time = release.time
-                    return True
-        return False
+    @classmethod
+    def interned(cls, constr: str) -> Specifier:
+        """Returns the constraint shared with all other users through `INTERN_TABLE`.
+
+        The result must not be changed, attach time to a copy of it.
+        """
+        return INTERN_TABLE.get(constr, cls)
+
+    def attach_time(self, releases: Iterable | ReleaseIndex) -> bool:
+        """Attach time of the release with the same version.
+
+        Pass `ReleaseIndex` to not index releases for every specifier.
+        """
+        time = ReleaseIndex.from_releases(releases).get(self._spec.version)
+        if time is None:
+            return False
+        self.time = time
+        return True
 
     def _check_version(self, version: Version | str) -> bool:
         """
         https://www.python.org/dev/peps/pep-0440/
         """
         if isinstance(version, str):
-            version = parse(version)
-        return version in self._spec
+            version = parse_version(version)
+        checker = self._checker
+        if checker is None:
+            checker = self._checker = self._make_checker()
+        return checker(version)
+
+    def _make_checker(self) -> Callable[[Version], bool]:
+        """Comparison of the version with precomputed bounds.
+
+        It gives the same result as `packaging` with prereleases allowed,
+        but doesn't coerce the version and dispatch the operator on every call.
+        """
+        operator, raw_version = self._spec.operator, self._spec.version
+        # arbitrary equality compares strings
+        if operator == '===':
+            expected = raw_version.lower()
+            return lambda version: str(version).lower() == expected
+
+        # `==1.2.*` is a prefix of the release padded by zeros
+        if raw_version.endswith('.*'):
+            prefix_version = parse_version(raw_version[:-2])
+            epoch = prefix_version.epoch
+            prefix = prefix_version.release
+            size = len(prefix)
+            matches = operator == '=='
+
+            def check_prefix(version: Version) -> bool:
+                release = version.release
+                if len(release) < size:
+                    release += (0, ) * (size - len(release))
+                return (version.epoch == epoch and release[:size] == prefix) is matches
+            return check_prefix
+
+        bounds = self.compile().bounds
+        if not bounds:
+            return lambda version: False
+        if bounds == (MIN, ):
+            return lambda version: True
+        if len(bounds) == 1:
+            lower = bounds[0]
+            return lambda version: version_key(version) >= lower
+        if len(bounds) == 2:
+            lower, upper = bounds
+            if lower == MIN:
+                return lambda version: version_key(version) < upper
+            return lambda version: lower <= version_key(version) < upper
+        if len(bounds) == 3 and bounds[0] == MIN:
+            _, lower, upper = bounds
+            return lambda version: not lower <= version_key(version) < upper
+        intervals = self.compile()
+        return lambda version: intervals.contains_key(version_key(version))
+
+    def compile(self) -> Intervals:
+        """Convert the constraint into disjoint version intervals.
+        """
+        intervals = self._intervals
+        if intervals is None:
+            raise ValueError('cannot compile arbitrary equality: {}'.format(self))
+        return intervals
+
+    @property
+    def _intervals(self) -> Intervals | None:
+        # interned specifiers are shared between threads, so the value is read once
+        compiled = self._compiled
+        if compiled is None:
+            bounds = specifier_bounds(self._spec.operator, self._spec.version)
+            compiled = self._compiled = False if bounds is None else Intervals(bounds)
+        if compiled is False:
+            return None
+        return cast(Intervals, compiled)
 
     def to_marker(self, name: str, wrap: bool = False) -> str:
+        try:
+            version = str(self.version)
+        except InvalidVersion:
+            # star versions like `1.*` can't be parsed, markers accept them as is
+            version = self.raw_version
         return '{name} {operator} "{version}"'.format(
             name=name,
             operator=self.operator,
-            version=self.version,
+            version=version,
         )
 
     @property
@@ -88,9 +197,11 @@ class Specifier:
     def raw_version(self) -> str:
         return self._spec.version
 
-    @cached_property
+    @property
     def version(self) -> Version:
-        return parse(self.raw_version)
+        if self._version is None:
+            self._version = parse_version(self.raw_version)
+        return self._version
 
     # magic methods
 
@@ -110,6 +221,31 @@ class Specifier:
         # compare release by version
         return self._check_version(version=release.version)
 
+    # pickle only the constraint, it's much smaller than `packaging` objects
+    def __reduce__(self) -> tuple:
+        constr = str(self._spec)
+        # unpickled constraints are shared with the ones parsed in this process
+        if self.time is None:
+            return type(self).interned, (constr, )
+        return type(self), (constr, ), self.time
+
+    def __setstate__(self, time: Any) -> None:
+        self.time = time
+
+    def __deepcopy__(self, memo: dict) -> Specifier:
+        # the copy can get time attached, so it must not be interned
+        return self.__copy__()
+
+    def __copy__(self) -> Specifier:
+        new = object.__new__(type(self))
+        new._spec = self._spec
+        new.time = self.time
+        new._version = self._version
+        new._hash = self._hash
+        new._compiled = self._compiled
+        new._checker = self._checker
+        return new
+
     def __str__(self) -> str:
         return str(self._spec)
 
@@ -153,12 +289,30 @@ class Specifier:
     def __lt__(self, other: object) -> bool:
         if not isinstance(other, type(self)):
             return NotImplemented
-        return self.version < other.version
+        try:
+            return self.version < other.version
+        except InvalidVersion:
+            # star versions like `1.*` can't be parsed, they are compared by the prefix
+            return parse_version(self.raw_version.rstrip('.*')) < parse_version(other.raw_version.rstrip('.*'))
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, type(self)):
             return NotImplemented
-        return self.version == other.version and self.operator == other.operator
+        if self.operator != other.operator:
+            return False
+        try:
+            return self.version == other.version
+        except InvalidVersion:
+            # star versions like `1.*` can't be parsed
+            return self.raw_version == other.raw_version
 
     def __hash__(self) -> int:
-        return hash(self._spec)
+        if self._hash is None:
+            # consistent with `__eq__` and cheaper than hashing `packaging` specifier
+            try:
+                self._hash = hash((self.operator, self.version))
+            except InvalidVersion:
+                self._hash = hash(self._spec)
+        return self._hash
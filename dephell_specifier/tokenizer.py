@@ -0,0 +1,95 @@
+"""Single-pass tokenizer for PEP-440, NPM, Ruby, and Maven specifiers.
+
+The tokenizer walks the string once and splits it on three levels:
+
+1. `||` separated alternatives.
+2. Maven-style alternatives: intervals separated by comma like `(,1.0],[1.2,)`.
+3. Constraints separated by commas or whitespace.
+
+Every constraint is cleaned: stars and `x` placeholders are normalized,
+operators without a version (`>=*`) are dropped, and `==` is added
+to versions without an operator.
+"""
+from __future__ import annotations
+
+import re
+
+from .constants import OPERATOR_SYMBOLS
+
+
+REX_TOKEN = re.compile(r"""
+    (?P<or>\|\|)
+    |
+    # npm-style range: `1.2.3 - 2.3.4`
+    (?P<left>[^\s,|]+)\ -\ (?P<right>[^\s,|]+)
+    |
+    # operator and closing maven bracket can be separated from the version by spaces
+    (?P<operator>(?:[!<>=~^\[(]\s*)*)(?P<version>[^\s,|]+(?:\s+[\])])?)
+    |
+    (?P<comma>,)
+    |
+    (?P<pipe>\|)
+""", re.VERBOSE)
+
+
+def clean_constraint(constr: str) -> str:
+    """Normalize the constraint without spaces, returns empty string for `*`.
+    """
+    if constr == '*':
+        return ''
+    if 'x' in constr or 'X' in constr or '*' in constr:
+        constr = constr.replace('.x', '.*')
+        constr = constr.replace('.X', '.*')
+        constr = constr.replace('.*.*', '.*')
+        if constr.lstrip(OPERATOR_SYMBOLS).lower() in ('x', '*'):
+            return ''
+
+    # add operator to constraint without operator
+    if constr[0] not in OPERATOR_SYMBOLS and constr[-1] not in OPERATOR_SYMBOLS:
+        return '==' + constr
+    # replace `=` operator by `==`
+    if len(constr) > 1 and constr[0] == '=' and constr[1] not in OPERATOR_SYMBOLS:
+        return '==' + constr[1:]
+    return constr
+
+
+def tokenize(spec: str) -> list[list[list[str]]]:
+    """Split the specifier on `||` alternatives, maven alternatives, and constraints.
+
+    NPM ranges (`1.2.3 - 2.3.4`) are kept as a single constraint.
+    """
+    result: list[list[list[str]]] = []
+    alternatives: list[list[str]] = []
+    constraints: list[str] = []
+    for match in REX_TOKEN.finditer(spec):
+        kind = match.lastgroup
+        if kind == 'version':
+            operator = match.group('operator')
+            constr = operator + match.group('version')
+            if operator or constr[-1] in '])':
+                constr = ''.join(constr.split())
+            constr = clean_constraint(constr)
+            if constr:
+                constraints.append(constr)
+        elif kind == 'comma':
+            # maven intervals: `(,1.0],[1.2,)`
+            start = match.start()
+            if 0 < start < len(spec) - 1 and spec[start - 1] in '])' and spec[start + 1] in '[(':
+                alternatives.append(constraints)
+                constraints = []
+        elif kind == 'right':
+            constr = match.group('left') + ' - ' + match.group('right')
+            if 'x' in constr or 'X' in constr:
+                constr = constr.replace('.x', '.*').replace('.X', '.*')
+            constraints.append(constr)
+        elif kind == 'pipe':
+            alternatives.append(constraints)
+            constraints = []
+        elif kind == 'or':
+            alternatives.append(constraints)
+            result.append(alternatives)
+            alternatives = []
+            constraints = []
+    alternatives.append(constraints)
+    result.append(alternatives)
+    return result
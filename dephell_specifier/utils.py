@@ -7,6 +7,9 @@ class cached_property:  # noqa: N801
     """
     A property that is only computed once per instance and then replaces itself
     with an ordinary attribute. Deleting the attribute resets the property.
+
+    Threads can compute the value concurrently, but the first stored value
+    is returned to all of them, so the value must not depend on the thread.
     """
 
     def __init__(self, func) -> None:
@@ -16,5 +19,6 @@ class cached_property:  # noqa: N801
     def __get__(self, obj, cls):
         if obj is None:
             return self
-        value = obj.__dict__[self.func.__name__] = self.func(obj)
-        return value
+        value = self.func(obj)
+        # `setdefault` is atomic: publish the value only if no other thread did it
+        return obj.__dict__.setdefault(self.func.__name__, value)
@@ -0,0 +1,281 @@
+"""Evaluate specifiers over many versions at once.
+
+Versions are encoded once as integer ranks of their comparison keys,
+and then every specifier is evaluated into a boolean mask by vectorized
+comparisons of these ranks. NumPy is optional: without it, the same
+algorithm returns lists of bools.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+from packaging.version import Version
+
+from .cache import parse_version
+from .constants import JoinTypes
+from .git_specifier import GitSpecifier
+from .intervals import BoundKey, Intervals, version_key
+from .range_specifier import RangeSpecifier
+from .specifier import Specifier
+
+
+if TYPE_CHECKING:
+    import numpy
+else:
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+
+class VersionArray:
+    """Versions (and, optionally, release times) prepared for evaluation.
+
+    Every distinct version gets a rank: position in sorted list of distinct
+    version keys. So, comparing a version with a boundary is comparing
+    two integers, and the boundary rank is found by a binary search
+    over distinct versions only.
+
+    Times can be `datetime64` array or a list of datetimes. Missing time
+    (`NaT` or None) means that the version is checked instead of the time,
+    the same as `Specifier.__contains__` does.
+
+    Slices and bitsets index versions in sorted order (by version, stable),
+    so they are positions in `versions` if versions are sorted.
+    """
+    __slots__ = ('versions', 'keys', 'ranks', 'times', '_order', '_starts')
+
+    def __init__(self, versions: Sequence, times: Sequence | None = None) -> None:
+        self.versions = versions
+        keys = []
+        for version in versions:
+            if not isinstance(version, Version):
+                version = parse_version(version)
+            keys.append(version_key(version))
+        self.keys = sorted(set(keys))
+        positions = {key: index for index, key in enumerate(self.keys)}
+        ranks = [positions[key] for key in keys]
+        self._order: list[int] | None = None
+        self._starts: list[int] | None = None
+
+        if times is not None and len(times) != len(versions):
+            raise ValueError('versions and times must have the same length')
+        if numpy is None:
+            self.ranks: Any = ranks
+            self.times: Any = None if times is None else list(times)
+        else:
+            self.ranks = numpy.array(ranks, dtype=numpy.int64)
+            self.times = None if times is None else numpy.asarray(times, dtype='datetime64[us]')
+
+    def mask(self, spec: object) -> Any:
+        """Boolean mask of versions that match the specifier.
+
+        Returns NumPy array if NumPy is installed, list of bools otherwise.
+        """
+        if isinstance(spec, RangeSpecifier):
+            return self._range_mask(spec)
+        if isinstance(spec, Specifier):
+            return self._specifier_mask(spec)
+        if isinstance(spec, GitSpecifier):
+            return self._full(False)
+        raise TypeError('unsupported specifier: {!r}'.format(spec))
+
+    def intervals_mask(self, intervals: Intervals) -> Any:
+        # how many boundaries are less than or equal to the version is
+        # how many distinct versions are less than the boundary
+        positions = [bisect_left(self.keys, bound) for bound in intervals.bounds]
+        if numpy is not None:
+            counts = numpy.searchsorted(numpy.array(positions, dtype=numpy.int64), self.ranks, side='right')
+            return (counts & 1).astype(bool)
+
+        # mark distinct versions, and then map them on all versions
+        flags = []
+        inside = False
+        index = 0
+        for rank in range(len(self.keys)):
+            while index < len(positions) and positions[index] <= rank:
+                inside = not inside
+                index += 1
+            flags.append(inside)
+        return [flags[rank] for rank in self.ranks]
+
+    def slices(self, spec: object) -> list[slice]:
+        """Slices of sorted versions that match the specifier.
+        """
+        return self.matrix_slices([spec])[0]
+
+    def bitset(self, spec: object) -> int:
+        """Versions that match the specifier as bits of an integer.
+
+        Bit `i` is set if `i`-th version in sorted order matches.
+        """
+        return self.matrix([spec])[0]
+
+    def matrix(self, specs: Iterable) -> list[int]:
+        """Bitset (see `bitset`) for every specifier.
+        """
+        result = []
+        for slices in self.matrix_slices(specs):
+            bits = 0
+            for part in slices:
+                bits |= (1 << part.stop) - (1 << part.start)
+            result.append(bits)
+        return result
+
+    def matrix_slices(self, specs: Iterable) -> list[list[slice]]:
+        """Slices of sorted versions (see `slices`) for every specifier.
+
+        Boundaries of all specifiers are sorted together and mapped
+        on positions of versions in a single pass.
+        """
+        specs = list(specs)
+        compiled = [self._plain_intervals(spec) for spec in specs]
+        bounds: set[BoundKey] = set()
+        for intervals in compiled:
+            if intervals is not None:
+                bounds.update(intervals.bounds)
+        positions = self._positions(bounds)
+
+        size = len(self.ranks)
+        result = []
+        for spec, intervals in zip(specs, compiled):
+            if intervals is None:
+                result.append(self._mask_slices(self.mask(spec)))
+                continue
+            slices = []
+            for lower, upper in intervals:
+                start = positions[lower]
+                stop = size if upper is None else positions[upper]
+                if start < stop:
+                    slices.append(slice(start, stop))
+            result.append(slices)
+        return result
+
+    def _plain_intervals(self, spec: object) -> Intervals | None:
+        """Intervals of the specifier if it can be checked by version only.
+        """
+        if isinstance(spec, GitSpecifier):
+            return Intervals.empty()
+        if self.times is not None:
+            atoms = spec._atoms() if isinstance(spec, RangeSpecifier) else (spec, )
+            if any(getattr(atom, 'time', None) for atom in atoms):
+                return None
+        return getattr(spec, '_intervals', None)
+
+    def _sort(self) -> tuple[list[int], list[int]]:
+        """Indices of versions in sorted order and the first position of every rank in it.
+        """
+        order, starts = self._order, self._starts
+        if order is None or starts is None:
+            ranks = list(self.ranks)
+            order = sorted(range(len(ranks)), key=ranks.__getitem__)
+            counts = [0] * len(self.keys)
+            for rank in ranks:
+                counts[rank] += 1
+            starts = [0]
+            for count in counts:
+                starts.append(starts[-1] + count)
+            self._order, self._starts = order, starts
+        return order, starts
+
+    def _positions(self, bounds: Iterable) -> dict:
+        """How many versions are less than the boundary, for every boundary.
+        """
+        _, starts = self._sort()
+        keys = self.keys
+        result = dict()
+        index = 0
+        for bound in sorted(bounds):
+            while index < len(keys) and keys[index] < bound:
+                index += 1
+            result[bound] = starts[index]
+        return result
+
+    def _mask_slices(self, mask: Any) -> list[slice]:
+        order, _ = self._sort()
+        slices = []
+        start = None
+        for position, index in enumerate(order):
+            if mask[index]:
+                if start is None:
+                    start = position
+            elif start is not None:
+                slices.append(slice(start, position))
+                start = None
+        if start is not None:
+            slices.append(slice(start, len(order)))
+        return slices
+
+    def _range_mask(self, spec: RangeSpecifier) -> Any:
+        # time can be compared only atom by atom
+        if self.times is None or not any(getattr(atom, 'time', None) for atom in spec._atoms()):
+            intervals = spec._intervals
+            if intervals is not None:
+                return self.intervals_mask(intervals)
+
+        masks = [self.mask(child) for child in spec._specs]
+        if spec.join_type == JoinTypes.AND:
+            result = self._full(True)
+            for mask in masks:
+                result = self._combine(result, mask, all)
+            return result
+        result = self._full(False)
+        for mask in masks:
+            result = self._combine(result, mask, any)
+        return result
+
+    def _specifier_mask(self, spec: Specifier) -> Any:
+        intervals = spec._intervals
+        if intervals is not None:
+            mask = self.intervals_mask(intervals)
+        else:
+            # arbitrary equality compares strings
+            mask = [spec._check_version(str(version)) for version in self.versions]
+            if numpy is not None:
+                mask = numpy.array(mask, dtype=bool)
+
+        operation = spec.operation
+        if self.times is None or spec.time is None or operation is None or '*' in spec.raw_version:
+            return mask
+
+        # compare release by time if it is known, the same as `Specifier.__contains__`
+        if numpy is not None:
+            known = ~numpy.isnat(self.times)
+            by_time = operation(self.times, numpy.datetime64(spec.time, 'us'))
+            return numpy.where(known, by_time, mask)
+        return [
+            ok if time is None else operation(time, spec.time)
+            for ok, time in zip(mask, self.times)
+        ]
+
+    def _full(self, value: bool) -> Any:
+        if numpy is not None:
+            return numpy.full(len(self.ranks), value, dtype=bool)
+        return [value] * len(self.ranks)
+
+    @staticmethod
+    def _combine(left: Any, right: Any, rule) -> Any:
+        if numpy is not None:
+            if rule is all:
+                return numpy.logical_and(left, right)
+            return numpy.logical_or(left, right)
+        return [rule(pair) for pair in zip(left, right)]
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def __repr__(self) -> str:
+        return '{name}({count} versions)'.format(name=type(self).__name__, count=len(self.ranks))
+
+
+def evaluate(spec: object, versions: Sequence, times: Sequence | None = None) -> Any:
+    """Boolean mask of versions that match the specifier.
+    """
+    return VersionArray(versions, times=times).mask(spec)
+
+
+def acceptance_matrix(specs: Iterable, versions: Sequence, times: Sequence | None = None) -> list[int]:
+    """Bitset of matching versions (in sorted order) for every specifier.
+    """
+    return VersionArray(versions, times=times).matrix(specs)
@@ -0,0 +1,35 @@
+import pickle
+
+import pytest
+from packaging.specifiers import InvalidSpecifier
+
+from dephell_specifier import RangeSpecifier, Specifier
+from dephell_specifier.bulk import parse_many
+
+
+SPECS = ['>=1.0,<2', '^1.2 || ~2.3', 'garbage!', '[1.0,2.0)', '>=1.0,<2', '']
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parse_many(workers):
+    results = parse_many(SPECS, workers=workers, chunksize=2)
+    assert len(results) == len(SPECS)
+    for spec, result in zip(SPECS, results):
+        if spec == 'garbage!':
+            assert isinstance(result, InvalidSpecifier)
+            continue
+        assert result == RangeSpecifier(spec)
+    # duplicates are not shared
+    assert results[0] is not results[4]
+    # constraints are shared with the ones parsed in this process
+    for result in results:
+        if isinstance(result, RangeSpecifier):
+            assert all(atom is Specifier.interned(str(atom)) for atom in result._atoms())
+
+
+@pytest.mark.parametrize('spec', ['>=1.0,<2', '<1 || >=2,!=2.1', '===1.0'])
+def test_pickle(spec):
+    spec = RangeSpecifier(spec)
+    restored = pickle.loads(pickle.dumps(spec))
+    assert restored == spec
+    assert restored.join_type == spec.join_type
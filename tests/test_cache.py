@@ -0,0 +1,131 @@
+import pickle
+from copy import copy, deepcopy
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from packaging.version import Version
+
+from dephell_specifier import RangeSpecifier, Specifier
+from dephell_specifier.cache import (
+    INTERN_TABLE, RANGE_CACHE, SPECIFIER_CACHE, VERSION_CACHE, InternTable,
+    LRUCache, parse_version, warm_version_cache,
+)
+
+
+@pytest.fixture
+def caches():
+    RANGE_CACHE.resize(16)
+    SPECIFIER_CACHE.resize(16)
+    yield
+    for cache in (RANGE_CACHE, SPECIFIER_CACHE):
+        cache.resize(0)
+        cache.clear()
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.info() == (1, 1, 1, 2, 2)
+
+    cache.resize(1)
+    assert list(cache._data) == ['c']
+    assert cache.info().evictions == 2
+
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 1, 0)
+
+
+def test_disabled():
+    cache = LRUCache()
+    cache.set('a', 1)
+    assert cache.get('a') is None
+    assert cache.info() == (0, 0, 0, 0, 0)
+
+
+def test_range_cache(caches):
+    spec1 = RangeSpecifier('>=2.7 || <2')
+    spec2 = RangeSpecifier('>=2.7 || <2')
+    assert spec1._specs is spec2._specs
+    assert RANGE_CACHE.info().hits >= 1
+
+    spec1 += RangeSpecifier('<4')
+    assert str(spec2) == '<2 || >=2.7'
+    assert str(RangeSpecifier('>=2.7 || <2')) == '<2 || >=2.7'
+    assert '3.0' in spec2
+
+
+def test_specifier_cache(caches):
+    spec1 = Specifier('>=3.6')
+    spec2 = Specifier('>=3.6')
+    assert spec1 is not spec2
+    assert spec1._spec is spec2._spec
+    assert SPECIFIER_CACHE.info().hits == 1
+
+
+def test_attach_time_not_shared(caches):
+    releases = [SimpleNamespace(version='2.7', time=datetime(2010, 7, 3))]
+    spec1 = RangeSpecifier('>=2.7')
+    spec2 = RangeSpecifier('>=2.7')
+    assert spec1.attach_time(releases)
+    assert [spec.time for spec in spec1._specs] == [datetime(2010, 7, 3)]
+    assert [spec.time for spec in spec2._specs] == [None]
+
+
+def test_intern_table():
+    table = InternTable()
+    first = table.get('>=1', Specifier)
+    assert table.get('>=1', Specifier) is first
+    assert table.info() == (1, 1, 1, 0.5)
+
+    # objects are dropped when nothing refers to them
+    del first
+    assert len(table) == 0
+
+    table.enabled = False
+    assert table.get('>=1', Specifier) is not table.get('>=1', Specifier)
+    table.clear()
+    assert table.info() == (0, 0, 0, 0.0)
+
+
+def test_interned_atoms():
+    spec1 = RangeSpecifier('>=3.6,<4.0')
+    spec2 = RangeSpecifier('<4.0 || >=3.6,!=3.7')
+    atoms = {str(atom): atom for atom in spec1._atoms()}
+    for atom in spec2._atoms():
+        if str(atom) in atoms:
+            assert atom is atoms[str(atom)]
+    assert INTERN_TABLE.info().hits >= 2
+
+    # branches distributed by merging share atoms too
+    spec1 += RangeSpecifier('==3.* || ==5.*', lazy=True)
+    assert all(atom is Specifier.interned(str(atom)) for atom in spec1._atoms())
+
+
+def test_interned_pickle():
+    spec = RangeSpecifier('>=3.6,<4.0')
+    restored = pickle.loads(pickle.dumps(spec))
+    assert all(atom is Specifier.interned(str(atom)) for atom in restored._atoms())
+
+    # atoms with attached time are restored as separate objects
+    timed = copy(Specifier('>=3.6'))
+    timed.time = 'now'
+    restored_atom = pickle.loads(pickle.dumps(timed))
+    assert restored_atom.time == 'now'
+    assert restored_atom is not Specifier.interned('>=3.6')
+    assert deepcopy(Specifier.interned('>=3.6')) is not Specifier.interned('>=3.6')
+
+
+def test_version_cache():
+    VERSION_CACHE.clear()
+    assert warm_version_cache(['1.0', Version('1.1'), SimpleNamespace(version='1.2')]) == 3
+    assert warm_version_cache(['1.0']) == 0
+    assert parse_version('1.1') is VERSION_CACHE.get('1.1')
+    assert '1.0' in RangeSpecifier('<2')
+    assert VERSION_CACHE.info().hits >= 3
+    VERSION_CACHE.clear()
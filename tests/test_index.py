@@ -0,0 +1,71 @@
+import pytest
+from packaging.version import Version
+
+from dephell_specifier import GitSpecifier, RangeSpecifier
+from dephell_specifier.index import SpecifierIndex
+
+
+SPECS = {
+    'a': '>=1.0',
+    'b': '<2',
+    'c': '==1.*',
+    'd': '<1 || >=3',
+    'e': '!=2.0',
+    'f': '===2.0',
+}
+
+
+@pytest.mark.parametrize('version, accepting', [
+    ('0.9',     {'b', 'd', 'e'}),
+    ('1.0',     {'a', 'b', 'c', 'e'}),
+    ('1.5',     {'a', 'b', 'c', 'e'}),
+    ('2.0',     {'a', 'f'}),
+    ('2.0.1',   {'a', 'e'}),
+    ('3.0',     {'a', 'd', 'e'}),
+])
+def test_accepting(version, accepting):
+    index = SpecifierIndex({key: RangeSpecifier(spec) for key, spec in SPECS.items()})
+    assert index.accepting(version) == accepting
+    assert index.accepting(Version(version)) == accepting
+    assert index.rejecting(version) == set(SPECS) - accepting
+
+
+def test_add_and_remove():
+    index = SpecifierIndex()
+    first = index.add(RangeSpecifier('>=1'))
+    second = index.add(RangeSpecifier('<1'))
+    assert index.accepting('1.0') == {first}
+    assert index.rejecting('1.0') == {second}
+
+    # new boundary
+    third = index.add(RangeSpecifier('>=1.5'))
+    assert index.accepting('2.0') == {first, third}
+
+    index.remove(first)
+    assert first not in index
+    assert index.accepting('2.0') == {third}
+    assert index.rejecting('2.0') == {second}
+    with pytest.raises(KeyError):
+        index.remove(first)
+
+    # the key is replaced
+    index.add(RangeSpecifier('<1.5'), key=third)
+    assert index.accepting('1.0') == {third}
+    assert len(index) == 2
+
+
+def test_git():
+    index = SpecifierIndex([RangeSpecifier('>=1'), GitSpecifier()])
+    assert index.accepting('1.0') == {0}
+    assert index.rejecting('1.0') == {1}
+
+
+def test_many():
+    specs = [RangeSpecifier('>={}.0,<{}.0'.format(major, major + 2)) for major in range(100)]
+    index = SpecifierIndex()
+    for spec in specs:
+        index.add(spec)
+    for major in range(101):
+        version = '{}.5'.format(major)
+        expected = {key for key, spec in enumerate(specs) if version in spec}
+        assert index.accepting(version) == expected
@@ -0,0 +1,73 @@
+import pytest
+from packaging.specifiers import Specifier as PackagingSpecifier
+from packaging.version import Version
+
+from dephell_specifier import RangeSpecifier, Specifier
+
+
+VERSIONS = [
+    '0', '1.1.99', '1.2.dev0', '1.2a1', '1.2a1.post1', '1.2rc1', '1.2', '1.2+local',
+    '1.2.0', '1.2.post1.dev0', '1.2.post1', '1.2.post1+local', '1.2.0.0.1', '1.2.1',
+    '1.3.dev0', '1.3', '2.0', '1!1.0',
+]
+
+
+@pytest.mark.parametrize('constr', [
+    '<1.2', '<=1.2', '>1.2', '>=1.2', '==1.2', '!=1.2', '~=1.2', '~=1.2.0',
+    '<1.2a1', '>1.2a1', '<1.2.post1', '>1.2.post1', '>1.2.dev0',
+    '==1.2.*', '!=1.2.*', '==1.2+local', '!=1.2+local', '<0', '>=0.dev0',
+])
+def test_specifier_compile(constr):
+    intervals = Specifier(constr).compile()
+    expected = PackagingSpecifier(constr, prereleases=True)
+    for version in VERSIONS:
+        assert (version in intervals) is (Version(version) in expected), version
+
+
+@pytest.mark.parametrize('spec', [
+    '>=1.2,<2',
+    '<1.2 || >=1.3',
+    '(,1.2],[1.3,)',
+    '^1.2 || ~0.9 || ==1!1.*',
+    '>=1.2,!=1.2.1,!=1.3.* || <1.1',
+])
+def test_range_compile(spec):
+    spec = RangeSpecifier(spec)
+    intervals = spec.compile()
+    for version in VERSIONS:
+        expected = all if spec.join_type.name == 'AND' else any
+        assert (version in intervals) is expected(version in sub for sub in spec._specs)
+
+
+def test_compile_is_disjoint():
+    intervals = RangeSpecifier('>=1,<3 || >=2,<4 || ==5.*').compile()
+    assert len(intervals) == 2
+    assert list(intervals) == sorted(intervals)
+
+
+def test_compile_arbitrary_equality():
+    with pytest.raises(ValueError):
+        RangeSpecifier('===1.2').compile()
+    assert '1.2' in RangeSpecifier('===1.2')
+    assert '1.2.0' not in RangeSpecifier('===1.2')
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('>=1.2,<2',                '>=1.2,<2'),
+    ('<=1.2 || >1.3',           '<=1.2 || >1.3'),
+    ('>=1,!=1.2,<2',            '>=1,!=1.2,<2'),
+    ('>=1,!=1.2.*,!=1.4+local', '>=1,!=1.2.*,!=1.4+local'),
+    ('==1.2.* || ==1.2+local',  '==1.2.*'),
+    ('==1.2+local || >=2',      '==1.2+local || >=2'),
+    ('~=1.2.3',                 '>=1.2.3,<1.3'),
+    ('<1.2a1',                  '<1.2a1'),
+    ('<0',                      '<0'),
+    ('',                        ''),
+])
+def test_to_constraints(spec, expected):
+    intervals = RangeSpecifier(spec).compile()
+    groups = intervals.to_constraints()
+    assert groups is not None
+    rendered = ' || '.join(','.join(group) for group in groups)
+    assert RangeSpecifier(rendered).compile() == intervals
+    assert RangeSpecifier(rendered) == RangeSpecifier(expected)
@@ -1,6 +1,11 @@
+from datetime import datetime
+from types import SimpleNamespace
+
 import pytest
+from packaging.specifiers import InvalidSpecifier
 
-from dephell_specifier import RangeSpecifier
+from dephell_specifier import GitSpecifier, RangeSpecifier
+from dephell_specifier.pythons import PythonTable
 
 
 @pytest.mark.parametrize('operator, mask', [
@@ -246,6 +251,7 @@ def test_or(version, ok):
     ('>=2.7',           'm >= "2.7"'),
     ('>=2.7,<3.4',      'm >= "2.7" and m < "3.4"'),
     ('>=2.7 || >=3.4',  'm >= "2.7" or m >= "3.4"'),
+    ('^1.2',            'm == "1.*" and m >= "1.2.0"'),
 ])
 def test_to_marker(spec, marker):
     assert RangeSpecifier(spec).to_marker('m') == marker
@@ -254,16 +260,27 @@ def test_to_marker(spec, marker):
 @pytest.mark.parametrize('left, right, expected', [
     ('>=2.7', '<=3.4', '>=2.7,<=3.4'),
     ('>=2.7', '>=3.4,<=3.7', '>=2.7,>=3.4,<=3.7'),
-    ('==2.7 || >=3.4', '<=3.7', '==2.7,<=3.7 || >=3.4,<=3.7'),
-    ('==2.7 || >=3.4', '!=3.6,<=3.7', '==2.7,!=3.6,,<=3.7 || >=3.4,!=3.6,,<=3.7'),
-    ('<=3.7', '==2.7 || >=3.4', '==2.7,<=3.7 || >=3.4,<=3.7'),
-    ('<=3.7 || !=3.6', '==2.7 || >=3.4', '<=3.7,==2.7 || <=3.7,>=3.4 || !=3.6,==2.7 || !=3.6,>=3.4'),
+    ('==2.7 || >=3.4', '<=3.7', '==2.7 || >=3.4,<=3.7'),
+    ('==2.7 || >=3.4', '!=3.6,<=3.7', '==2.7 || >=3.4,!=3.6,<=3.7'),
+    ('<=3.7', '==2.7 || >=3.4', '==2.7 || >=3.4,<=3.7'),
+    ('<=3.7 || !=3.6', '==2.7 || >=3.4', '==2.7 || >=3.4'),
+    ('<2 || >=3', '>=1,<4 || ==5.*', '>=1,<2 || >=3,!=4.*,<6'),
+    ('<2 || >=3', '>=2,<3', '<0'),
+    # arbitrary equality cannot be simplified
+    ('===2.7 || >=3.4', '<=3.7', '===2.7,<=3.7 || >=3.4,<=3.7'),
 ])
 def test_merging(left, right, expected):
     spec = RangeSpecifier(left) + RangeSpecifier(right)
     assert spec == RangeSpecifier(expected)
 
 
+def test_merging_is_bounded():
+    spec = RangeSpecifier('<1 || >=2,<3 || >=4')
+    for _ in range(10):
+        spec += RangeSpecifier('<1 || >=2,<3 || >=4')
+    assert str(spec) == '<1 || <3,>=2 || >=4'
+
+
 @pytest.mark.parametrize('spec, expected', [
     ('>=2.7',                   '>=2.7'),
     ('>=2.7,<3.4',              '>=2.7,<3.4'),
@@ -298,3 +315,281 @@ def test_peppify_python(spec, expected):
 ])
 def test_intervals(spec, expected):
     assert str(RangeSpecifier(spec)) == str(RangeSpecifier(expected))
+
+
+@pytest.mark.parametrize('spec', [
+    '>=1.2,<2',
+    '<1.1 || >=1.3,!=1.4.1',
+    '==1.2.*',
+    '>=2.0',
+    '<0',
+    '',
+])
+def test_filter(spec):
+    versions = ['0.9', '1.0', '1.1', '1.2', '1.2.1', '1.3rc1', '1.3', '1.4.1', '1.5']
+    spec = RangeSpecifier(spec)
+    expected = [version for version in versions if version in spec]
+    assert spec.filter(versions) == expected
+    assert spec.max_satisfying(versions) == (expected[-1] if expected else None)
+    assert spec.min_satisfying(versions) == (expected[0] if expected else None)
+
+
+def test_filter_not_compiled():
+    spec = RangeSpecifier('===1.2 || >=1.4')
+    versions = ['1.1', '1.2', '1.2.0', '1.4', '1.5']
+    assert spec.filter(versions) == ['1.2', '1.4', '1.5']
+    assert spec.max_satisfying(versions) == '1.5'
+    assert spec.min_satisfying(versions) == '1.2'
+
+
+@pytest.mark.parametrize('expr, expected', [
+    (lambda a, b: a & b,    '>=1.5,<2 || >=3,<3.5'),
+    (lambda a, b: a | b,    '<4'),
+    # pre-releases of 1.5 are not in `>=1.5`, so it's not `<1.5`
+    (lambda a, b: a - b,    '<=1.5,!=1.5 || >=3.5.dev0,<4'),
+    (lambda a, b: b - a,    '>=2.dev0,<=3,!=3'),
+    (lambda a, b: ~a,       '>=2.dev0,<=3,!=3 || >=4.dev0'),
+])
+def test_algebra(expr, expected):
+    left = RangeSpecifier('<2 || >=3,<4')
+    right = RangeSpecifier('>=1.5,<3.5')
+    assert expr(left, right) == RangeSpecifier(expected)
+
+
+@pytest.mark.parametrize('spec', [
+    '>=1,!=1.2,<2',
+    '==1.2.*',
+    '!=1.2.*',
+    '>=1.2',
+    '>1.2',
+    '<1.2a1 || ==1.3+local',
+    '',
+    '<0',
+])
+def test_complement(spec):
+    versions = ['1.0', '1.1', '1.2rc1', '1.2', '1.2+local', '1.2.post1', '1.2.1', '1.3+local', '2.0']
+    spec = RangeSpecifier(spec)
+    complement = ~spec
+    for version in versions:
+        assert (version in complement) is not (version in spec), version
+    assert (~complement).compile() == spec.compile()
+
+
+@pytest.mark.parametrize('spec, empty, exact', [
+    ('>=1.2,<1.2',      True,   False),
+    ('>1.2,<=1.2',      True,   False),
+    ('<0',              True,   False),
+    ('==1.2.*,<1.2a1',  False,  False),
+    ('==1.2',           False,  True),
+    ('>=1.2,<=1.2',     False,  True),
+    ('==1.2+local',     False,  True),
+    ('==1.2.*',         False,  False),
+    ('<2 || >=3',       False,  False),
+    ('',                False,  False),
+])
+def test_is_empty_and_exact(spec, empty, exact):
+    spec = RangeSpecifier(spec)
+    assert spec.is_empty() is empty
+    assert spec.is_exact() is exact
+
+
+@pytest.mark.parametrize('left, right, subset, overlaps', [
+    ('>=1.2,<1.5',      '>=1,<2',           True,   True),
+    ('>=1,<2',          '>=1.2,<1.5',       False,  True),
+    ('==1.2',           '==1.*',            True,   True),
+    ('==1.2',           '!=1.2',            False,  False),
+    ('<1 || >=3',       '<2 || >=3',        True,   True),
+    ('<1 || >=3',       '<2 || >=3,<4',     False,  True),
+    ('>=2',             '<1 || >=1.5',      True,   True),
+    ('<1',              '>=1',              False,  False),
+    ('<0',              '>=1',              True,   False),
+    ('>1.2',            '>=1.2',            True,   True),
+    ('>=1.2',           '>1.2',             False,  True),
+])
+def test_issubset_and_overlaps(left, right, subset, overlaps):
+    left = RangeSpecifier(left)
+    right = RangeSpecifier(right)
+    assert left.issubset(right) is subset
+    assert left.overlaps(right) is overlaps
+    assert right.overlaps(left) is overlaps
+
+
+def test_peppify_custom_pythons():
+    pythons = PythonTable(['3.8', '3.9', '3.10', '3.11'])
+    spec = RangeSpecifier('==3.8.* || >=3.10')
+    assert str(spec.peppify(pythons)) == '!=3.9.*,>=3.8'
+    # cached result is not shared
+    assert spec.peppify(pythons) is not spec.peppify(pythons)
+
+    pythons.set_versions(['3.8', '3.9', '3.10', '3.11', '3.12'])
+    assert str(RangeSpecifier('==3.8.* || ==3.10.*').peppify(pythons)) == '!=3.9.*,<3.11,>=3.8'
+
+
+@pytest.mark.parametrize('spec, ok', [
+    ('>=3.8',           True),
+    ('<2',              False),
+    ('<2 || >=3.12',    True),
+    ('==2.5.*',         False),
+    ('===3.8 || <2',    True),
+])
+def test_python_compat(spec, ok):
+    assert RangeSpecifier(spec).python_compat is ok
+
+
+@pytest.mark.parametrize('left, right, equal', [
+    ('>=1,<2',          '<2,>=1.0',         True),
+    ('>=1,<2',          '<2,>=1.0.0',       True),
+    ('<2 || >3',        '>3.0 || <2',       True),
+    ('==1.*',           '==1.*',            True),
+    ('>=1',             '>1',               False),
+    ('>=1,<2',          '>=1',              False),
+    ('<2 || >3',        '<2,>3',            False),
+])
+def test_eq_and_hash(left, right, equal):
+    left = RangeSpecifier(left)
+    right = RangeSpecifier(right)
+    assert (left == right) is equal
+    if equal:
+        assert hash(left) == hash(right)
+        assert len({left, right}) == 1
+
+
+def test_eq_after_mutation():
+    spec = RangeSpecifier('>=1')
+    other = RangeSpecifier('>=1.0,<2')
+    assert spec != other
+    old_hash = hash(spec)
+    spec += RangeSpecifier('<2')
+    assert spec == other
+    assert hash(spec) == hash(other) != old_hash
+    assert str(spec) == '<2,>=1'
+
+
+@pytest.mark.parametrize('spec', [
+    '>=1.0,<2',
+    '^1.2 || ~2.3',
+    '[1.0,2.0)',
+    '==1.*',
+])
+def test_lazy(spec):
+    lazy = RangeSpecifier(spec, lazy=True)
+    assert lazy._raw == spec
+    copied = lazy.copy()
+    assert copied._raw == spec
+
+    eager = RangeSpecifier(spec)
+    assert '1.5' in lazy
+    assert lazy._raw is None
+    assert lazy == eager
+    assert str(copied) == str(eager)
+    assert str(lazy.peppify()) == str(eager.peppify())
+
+
+def test_lazy_attach():
+    spec = RangeSpecifier('>=1', lazy=True)
+    spec += RangeSpecifier('<2', lazy=True)
+    assert str(spec) == '<2,>=1'
+
+
+def test_lazy_invalid():
+    with pytest.raises(InvalidSpecifier):
+        RangeSpecifier('>=1.0; python_version', lazy=True)
+    # only unexpected characters are checked in advance
+    spec = RangeSpecifier('>=lol', lazy=True)
+    with pytest.raises(InvalidSpecifier):
+        '1.0' in spec
+    with pytest.raises(InvalidSpecifier):
+        '1.0' in spec
+
+
+def test_flatten():
+    spec = RangeSpecifier('>=1,<2 || >=3')
+    # arbitrary equality can't be simplified, so the merge is distributed
+    spec += RangeSpecifier('===1.5 || ===3.5')
+    flat = spec._flatten()
+    assert flat is not None
+    assert sorted(sorted(map(str, atoms)) for _, atoms in flat) == [
+        ['<2', '===1.5', '>=1'],
+        ['<2', '===3.5', '>=1'],
+        ['===1.5', '>=3'],
+        ['===3.5', '>=3'],
+    ]
+    assert '1.5' in spec
+    assert '3.5' in spec
+    assert '2.5' not in spec
+
+
+def test_contains_flat_reordering():
+    spec = RangeSpecifier('<1 || >=2,<3 || >=5')
+    spec.attach_time([SimpleNamespace(version='5', time=datetime(2015, 1, 1))])
+    release = SimpleNamespace(version='6.0', time=datetime(2016, 1, 1))
+    old = SimpleNamespace(version='6.0', time=datetime(2014, 1, 1))
+    for _ in range(3):
+        assert release in spec
+        assert old not in spec
+    # the branch that matches is checked first
+    assert isinstance(spec._flat, tuple)
+    assert [str(atom) for atom in spec._flat[0][1]] == ['>=5']
+    assert SimpleNamespace(version='0.5', time=None) in spec
+
+
+def test_flatten_timed_atoms():
+    # equal atoms with and without time are different checks
+    spec = RangeSpecifier('>=2.0,<3')
+    spec.attach_time([SimpleNamespace(version='2.0', time=datetime(2010, 1, 1))])
+    spec += RangeSpecifier('>=2.0 || >9')
+    flat = spec._flatten()
+    assert flat is not None
+    assert all(len(atoms) == 3 for _, atoms in flat)
+    assert SimpleNamespace(version='2.5', time=datetime(1999, 1, 1)) not in spec
+    assert SimpleNamespace(version='2.5', time=datetime(2011, 1, 1)) in spec
+
+
+@pytest.mark.parametrize('specs, expected', [
+    (['>=1', '>=2', '<3'],              '<3,>=2'),
+    (['>=1,<3', '<2 || >=2.5'],         '<2,>=1 || <3,>=2.5'),
+    (['>=2', '<1'],                     '<0'),
+    (['==1.*', '!=1.5'],                '!=1.5,<2,>=1.dev0'),
+    (['>=1', '===1.0'],                 '===1.0,>=1'),
+    ([],                                ''),
+])
+def test_merge_all(specs, expected):
+    specs = [RangeSpecifier(spec) for spec in specs]
+    assert str(RangeSpecifier.merge_all(specs)) == expected
+
+
+def test_merge_all_git():
+    git = GitSpecifier()
+    spec = RangeSpecifier('>=1 || <0.5')
+    merged = RangeSpecifier.merge_all([git, spec])
+    assert git in merged._specs
+    assert list(merged._specs) == list((git + spec)._specs)
+
+    # git constraint is kept without range specifiers too
+    merged = RangeSpecifier.merge_all([git])
+    assert list(merged._specs) == [git]
+    assert '1.0' not in merged
+    assert str(RangeSpecifier.merge_all([])) == ''
+    with pytest.raises(TypeError):
+        RangeSpecifier.merge_all([spec, '>=1'])
+
+
+def test_add_deferred():
+    left = RangeSpecifier('>=1')
+    right = RangeSpecifier('<2 || >=3')
+    merged = left + right + RangeSpecifier('!=1.5')
+    # parts are flattened and not merged yet
+    assert merged._parts is not None
+    assert len(merged._parts) == 3
+    assert '1.2' in merged
+    assert '1.5' not in merged
+    assert '2.5' not in merged
+    assert merged._parts is not None
+
+    # operands can be changed, the result is not affected
+    left += RangeSpecifier('>=5')
+    copied = merged.copy()
+    assert str(merged) == '!=1.5,<2,>=1 || >=3'
+    assert merged._parts is None
+    assert str(copied) == str(merged)
+    assert str(left) == '>=1,>=5'
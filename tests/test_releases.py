@@ -0,0 +1,48 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from dephell_specifier import RangeSpecifier, Specifier
+from dephell_specifier.releases import ReleaseIndex, attach_times
+
+
+RELEASES = [
+    SimpleNamespace(version='1.0.0', time=datetime(2010, 1, 1)),
+    SimpleNamespace(version='1.1', time=datetime(1970, 1, 1)),
+    SimpleNamespace(version='1.2', time=datetime(2012, 1, 1)),
+    SimpleNamespace(version='1.2.0', time=datetime(2013, 1, 1)),
+    SimpleNamespace(version='2.0', time=datetime(2014, 1, 1)),
+]
+
+
+def test_index():
+    index = ReleaseIndex(RELEASES)
+    # normalized version
+    assert index.get('1.0') == datetime(2010, 1, 1)
+    # unknown time
+    assert index.get('1.1') is None
+    # the first release wins
+    assert index.get('1.2') == datetime(2012, 1, 1)
+    assert index.get('1.*') is None
+    assert len(index) == 3
+    assert ReleaseIndex.from_releases(index) is index
+
+
+def test_specifier_attach_time():
+    index = ReleaseIndex(RELEASES)
+    spec = Specifier('>=1.0')
+    assert spec.attach_time(index)
+    assert spec.time == datetime(2010, 1, 1)
+    assert not Specifier('<1.1').attach_time(index)
+
+
+def test_range_attach_time_generator():
+    spec = RangeSpecifier('>=1.0,<2.0')
+    # generator is consumed only once
+    assert spec.attach_time(release for release in RELEASES)
+    assert sorted(atom.time.year for atom in spec._specs) == [2010, 2014]
+
+
+def test_attach_times():
+    specs = [RangeSpecifier('>=1.0'), RangeSpecifier('<1.1 || >=2.0'), RangeSpecifier('==3.0')]
+    assert attach_times(specs, RELEASES) == 2
+    assert specs[0]._specs[0].time == datetime(2010, 1, 1)
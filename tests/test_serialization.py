@@ -0,0 +1,65 @@
+import pytest
+
+from dephell_specifier import GitSpecifier, RangeSpecifier, Specifier
+from dephell_specifier.serialization import (
+    DiskCache, dumps, loads, write_cache,
+)
+
+
+SPECS = [
+    '>=1.0,<2',
+    '<1 || >=2,!=2.1',
+    '^1.2 || ~2.3',
+    '[1.0,2.0)',
+    '==1.2.*',
+    '===1.0',
+    '',
+]
+
+
+@pytest.mark.parametrize('spec', SPECS)
+def test_dumps_loads(spec):
+    spec = RangeSpecifier(spec)
+    restored = loads(dumps(spec))
+    assert isinstance(restored, RangeSpecifier)
+    assert restored == spec
+    assert restored.join_type == spec.join_type
+    assert restored._intervals == spec._intervals
+
+
+def test_dumps_loads_atoms():
+    spec = loads(dumps(Specifier('>=1.0')))
+    assert isinstance(spec, Specifier)
+    assert str(spec) == '>=1.0'
+    assert isinstance(loads(dumps(GitSpecifier())), GitSpecifier)
+
+
+def test_disk_cache(tmp_path):
+    path = str(tmp_path / 'specs.bin')
+    assert write_cache(path, SPECS + ['garbage!']) == len(SPECS)
+    with DiskCache(path) as cache:
+        assert len(cache) == len(SPECS)
+        for spec in SPECS:
+            assert cache.get(spec) == RangeSpecifier(spec)
+        assert cache.get('>=3') is None
+        assert 'garbage!' not in cache
+        assert cache.parse('>=3') == RangeSpecifier('>=3')
+
+
+def test_disk_cache_invalid(tmp_path):
+    path = tmp_path / 'specs.bin'
+    path.write_bytes(b'not a cache' * 4)
+    with pytest.raises(ValueError):
+        DiskCache(str(path))
+
+
+@pytest.mark.parametrize('size', [0, 10, 30])
+def test_disk_cache_truncated(tmp_path, size):
+    path = str(tmp_path / 'specs.bin')
+    write_cache(path, SPECS)
+    with open(path, 'rb') as stream:
+        data = stream.read()
+    with open(path, 'wb') as stream:
+        stream.write(data[:size])
+    with pytest.raises(ValueError):
+        DiskCache(path)
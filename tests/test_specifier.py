@@ -1,6 +1,7 @@
+import packaging.specifiers
 import pytest
 
-from dephell_specifier import Specifier
+from dephell_specifier import RangeSpecifier, Specifier
 
 
 @pytest.mark.parametrize('left, right, result', [
@@ -58,3 +59,37 @@ def test_merge(left, right, result):
     else:
         merged = ls + rs
         assert str(merged) == result
+
+
+def test_slots():
+    assert not hasattr(Specifier('>=1.2'), '__dict__')
+    assert not hasattr(RangeSpecifier('>=1.2 || <1'), '__dict__')
+    assert type(RangeSpecifier('>=1.2,<2')._specs) is tuple
+
+
+def test_eq_star():
+    assert Specifier('==1.*') == Specifier('==1.*')
+    assert Specifier('==1.*') != Specifier('==2.*')
+    assert Specifier('==1.*') != Specifier('!=1.*')
+    assert len({Specifier('==1.*'), Specifier('==1.*')}) == 1
+    assert sorted([Specifier('>=2'), Specifier('==1.*'), Specifier('<1.5')]) == [
+        Specifier('==1.*'), Specifier('<1.5'), Specifier('>=2'),
+    ]
+
+
+VERSIONS = [
+    '0', '0.dev0', '1', '1.0.0', '1.0a1', '1.0rc2', '1.0.post1', '1.0.post1.dev2', '1.0.dev3',
+    '1.0+local', '1.0a1+local', '1.1', '1.0.0.1', '1!1.0', '2.0b1.post2.dev1', '10',
+]
+
+
+@pytest.mark.parametrize('constr', [
+    '==1.0', '==1.0+local', '!=1.0', '<1.0', '<=1.0', '>1.0', '>=1.0', '~=1.0', '===1.0',
+    '<1.0a1', '>1.0.post1', '<=1.0.dev3', '>1.0a1', '~=1.0.0', '>=1!1.0',
+    '==1.*', '==1.0.*', '!=1.0.*', '==1!1.*', '==0.*',
+])
+def test_check_version(constr):
+    spec = Specifier(constr)
+    for version in VERSIONS:
+        expected = packaging.specifiers.Specifier(constr, prereleases=True).contains(version)
+        assert spec._check_version(version) is expected, version
@@ -0,0 +1,107 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+
+from dephell_specifier import RangeSpecifier
+from dephell_specifier.cache import RANGE_CACHE, SPECIFIER_CACHE, VERSION_CACHE
+from dephell_specifier.pythons import PythonTable
+from dephell_specifier.utils import cached_property
+
+
+THREADS = 8
+SPECS = [
+    '>=1.{},<2'.format(minor) for minor in range(20)
+] + [
+    '^1.{} || ~2.{}'.format(minor, minor) for minor in range(20)
+] + [
+    '[1.{},2.0)'.format(minor) for minor in range(20)
+] + [
+    '==1.{}.* || >=3,!=3.{}'.format(minor, minor) for minor in range(20)
+]
+VERSIONS = ['0.9', '1.0', '1.5.1', '1.10', '2.0', '2.5', '3.0', '3.5', '4.0rc1']
+
+
+@pytest.fixture
+def contention():
+    # small caches to evict often, frequent thread switches
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    version_size = VERSION_CACHE.maxsize
+    RANGE_CACHE.resize(8)
+    SPECIFIER_CACHE.resize(8)
+    VERSION_CACHE.resize(4)
+    yield
+    sys.setswitchinterval(interval)
+    VERSION_CACHE.resize(version_size)
+    for cache in (RANGE_CACHE, SPECIFIER_CACHE):
+        cache.resize(0)
+        cache.clear()
+
+
+def _run(worker):
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return [future.result() for future in [executor.submit(worker) for _ in range(THREADS)]]
+
+
+def _matrix(specs):
+    return [[version in spec for version in VERSIONS] for spec in specs]
+
+
+def test_parse(contention):
+    expected = [str(RangeSpecifier(spec)) for spec in SPECS]
+
+    def worker():
+        return [str(RangeSpecifier(spec)) for spec in SPECS * 3][:len(SPECS)]
+
+    for result in _run(worker):
+        assert result == expected
+    assert len(RANGE_CACHE) <= 8
+
+
+def test_contains_shared(contention):
+    expected = _matrix([RangeSpecifier(spec) for spec in SPECS])
+    # lazy specifiers and deferred merges are materialized by concurrent checks
+    lazy = [RangeSpecifier(spec, lazy=True) for spec in SPECS]
+    merged = [RangeSpecifier(spec) + RangeSpecifier('<10') for spec in SPECS]
+
+    def worker():
+        return _matrix(lazy), _matrix(merged), [str(spec) for spec in merged]
+
+    for lazy_result, merged_result, rendered in _run(worker):
+        assert lazy_result == expected
+        assert merged_result == expected
+        assert rendered == [str(RangeSpecifier(spec) + RangeSpecifier('<10')) for spec in SPECS]
+
+
+def test_peppify_set_versions(contention):
+    pythons = PythonTable(['2.7', '3.5', '3.6', '3.7'])
+    spec = RangeSpecifier('<3 || >=3.6')
+    versions = [['2.7', '3.5', '3.6', '3.7'], ['2.7', '3.6', '3.7', '3.8', '3.9']]
+    allowed = {'!=3.5.*,>=2.7', '>=2.7'}
+
+    def worker():
+        results = set()
+        for index in range(50):
+            pythons.set_versions(versions[index % 2])
+            results.add(str(spec.peppify(pythons)))
+        return results
+
+    for results in _run(worker):
+        assert results <= allowed
+
+
+def test_cached_property():
+    barrier = Barrier(THREADS, timeout=10)
+
+    class Lazy:
+        @cached_property
+        def value(self):
+            # all threads compute the value at the same time
+            barrier.wait()
+            return object()
+
+    lazy = Lazy()
+    results = _run(lambda: lazy.value)
+    assert all(result is lazy.value for result in results)
@@ -0,0 +1,41 @@
+import pytest
+
+from dephell_specifier import RangeSpecifier
+from dephell_specifier.tokenizer import tokenize
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('>=1.2',               [[['>=1.2']]]),
+    ('>= 1.2, <2',          [[['>=1.2', '<2']]]),
+    ('>= 1.2 < 2',          [[['>=1.2', '<2']]]),
+    ('1.2',                 [[['==1.2']]]),
+    ('=1.2',                [[['==1.2']]]),
+    ('*',                   [[[]]]),
+    ('>=x',                 [[[]]]),
+    ('1.2.x',               [[['==1.2.*']]]),
+    ('1.2 - 2.3',           [[['1.2 - 2.3']]]),
+    ('1.2.x - 2.x',         [[['1.2.* - 2.*']]]),
+    ('<1 || >=2',           [[['<1']], [['>=2']]]),
+    ('(,1.0],[1.2,)',       [[['(', '1.0]'], ['[1.2', ')']]]),
+    ('[ 1.0, 2.0 )',        [[['[1.0', '2.0)']]]),
+])
+def test_tokenize(spec, expected):
+    assert tokenize(spec) == expected
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('<1.2.x',      '<1.2.0'),
+    ('> 1.x',       '>=2'),
+    ('>1.2.x',      '>=1.3'),
+    ('<=1.2.*',     '<=1.3'),
+])
+def test_star_with_operator(spec, expected):
+    assert str(RangeSpecifier(spec)) == expected
+
+
+@pytest.mark.parametrize('version, ok', [
+    ('1.2.5', False),
+    ('1.3.0', True),
+])
+def test_greater_than_star(version, ok):
+    assert (version in RangeSpecifier('>1.2.x')) is ok
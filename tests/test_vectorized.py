@@ -0,0 +1,83 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from dephell_specifier import RangeSpecifier, vectorized
+from dephell_specifier.vectorized import VersionArray
+
+
+VERSIONS = ['0.9', '1.0', '1.0.0', '1.1rc1', '1.1', '1.1+local', '1.2.post1', '2.0.dev1', '2.0', '3.0']
+TIMES = [
+    datetime(2010, 1, 1), datetime(2011, 1, 1), None, datetime(2012, 1, 1), datetime(2013, 1, 1),
+    None, datetime(2014, 1, 1), datetime(2015, 1, 1), datetime(2016, 1, 1), None,
+]
+SPECS = [
+    '>=1.0,<2',
+    '<1.1 || >=2,!=3.0',
+    '==1.1.*',
+    '~=1.1',
+    '===1.0 || >=3',
+    '<0',
+    '',
+]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(vectorized, 'numpy', None)
+    return request.param
+
+
+@pytest.mark.parametrize('spec', SPECS)
+def test_mask(backend, spec):
+    spec = RangeSpecifier(spec)
+    expected = [version in spec for version in VERSIONS]
+    assert list(VersionArray(VERSIONS).mask(spec)) == expected
+
+
+@pytest.mark.parametrize('spec', SPECS)
+def test_mask_time(backend, spec):
+    releases = [SimpleNamespace(version=version, time=datetime(2013, 6, 1)) for version in ('1.0', '2.0')]
+    spec = RangeSpecifier(spec)
+    spec.attach_time(releases)
+    expected = [
+        SimpleNamespace(version=version, time=time) in spec
+        for version, time in zip(VERSIONS, TIMES)
+    ]
+    assert list(VersionArray(VERSIONS, times=TIMES).mask(spec)) == expected
+
+
+def test_matrix(backend):
+    # shuffled, so sorted order differs from the input order
+    versions = VERSIONS[::-1]
+    array = VersionArray(versions)
+    order = sorted(range(len(versions)), key=lambda index: vectorized.parse_version(versions[index]))
+    specs = [RangeSpecifier(spec) for spec in SPECS]
+    matrix = vectorized.acceptance_matrix(specs, versions)
+    for spec, bits in zip(specs, matrix):
+        expected = [versions[index] in spec for index in order]
+        assert [bool(bits >> position & 1) for position in range(len(versions))] == expected
+        assert array.bitset(spec) == bits
+
+        covered = [False] * len(versions)
+        for part in array.slices(spec):
+            covered[part] = [True] * (part.stop - part.start)
+        assert covered == expected
+
+
+def test_matrix_time(backend):
+    releases = [SimpleNamespace(version='2.0', time=datetime(2013, 6, 1))]
+    spec = RangeSpecifier('>=2.0')
+    spec.attach_time(releases)
+    array = VersionArray(VERSIONS, times=TIMES)
+    # versions with known time are compared by time
+    expected = [
+        SimpleNamespace(version=version, time=time) in spec
+        for version, time in zip(VERSIONS, TIMES)
+    ]
+    bits = array.bitset(spec)
+    assert [bool(bits >> position & 1) for position in range(len(VERSIONS))] == expected